@@ -2,19 +2,151 @@
 
 import os
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def ignore_file(directory, contents):
-    # directory: the current folder being copied
-    # contents: list of names in that folder
-    return {name for name in contents if name in [".ropeproject"]}
-
-if os.path.isdir('src/mpy_tool/assets/examples/'):
-    shutil.rmtree('src/mpy_tool/assets/examples/')
-os.mkdir('src/mpy_tool/assets/examples/')
-shutil.copytree(
-    r"../mcu_template_software/examples/",
-    r"src/mpy_tool/assets/examples/",
-    dirs_exist_ok=True,
-    ignore=ignore_file,
-    symlinks=False       # follow symlinks; copy actual files
-)
\ No newline at end of file
+SRC_EXAMPLES_FOLDER = r"../mcu_template_software/examples/"
+DEST_EXAMPLES_FOLDER = r"src/mpy_tool/assets/examples/"
+IGNORE_NAMES = (".ropeproject",)
+# The number of file copies handed to a worker thread in each task.
+COPY_BATCH_SIZE = 64
+# On Linux os.sendfile() accepts any file as the output. On macOS/BSD the output must be a socket.
+USE_SENDFILE = sys.platform.startswith("linux")
+
+
+def fast_copy(src, dst):
+    """@brief Copy the contents of a file using as few syscalls as possible.
+              Unlike shutil.copy2() only the modification time is replicated
+              (so that later runs can detect unchanged files). On Linux the
+              data is copied by the kernel using a single os.sendfile() call.
+       @param src The source file.
+       @param dst The destination file."""
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        st = os.fstat(src_fd)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, st.st_mode & 0o777)
+        try:
+            # Nothing to copy for empty files.
+            if st.st_size > 0:
+                if USE_SENDFILE:
+                    offset = 0
+                    while offset < st.st_size:
+                        sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                else:
+                    with os.fdopen(src_fd, 'rb', closefd=False) as fsrc, \
+                         os.fdopen(dst_fd, 'wb', closefd=False) as fdst:
+                        shutil.copyfileobj(fsrc, fdst)
+        finally:
+            os.close(dst_fd)
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    finally:
+        os.close(src_fd)
+
+
+def link_or_copy(src, dst):
+    """@brief Hard link a file, falling back to copying it when the source and
+              destination are not on the same filesystem (or links are not
+              supported). A hard link costs a single syscall regardless of the
+              file size.
+       @param src The source file.
+       @param dst The destination file."""
+    # Remove any existing file first so that it is never written through
+    # (it may be an old hard link to the source file).
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        fast_copy(src, dst)
+
+
+def link_or_copy_batch(copy_list):
+    """@brief Link or copy a batch of files.
+       @param copy_list A list of (src, dst) file path tuples."""
+    for src, dst in copy_list:
+        link_or_copy(src, dst)
+
+
+def remove_path(path, is_dir):
+    """@brief Remove a file or folder tree.
+       @param path The path to remove.
+       @param is_dir True if path is a folder (not a symlink to one)."""
+    if is_dir:
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+def synctree_multithreaded(src, dst):
+    """@brief Sync a directory tree using a pool of threads.
+              Only files whose size or modification time differ from the
+              source are copied and files/folders no longer present in the
+              source are removed, so a rerun with few changes does little I/O.
+              Files are hard linked where possible. The examples tree holds
+              many small files so the copy is bound by per file syscall
+              overhead rather than CPU. The file copies in
+              each folder are submitted to a thread pool in batches so that
+              these overlap without paying the task overhead per file.
+       @param src The source folder.
+       @param dst The destination folder. This must exist."""
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def sync_dir(src_dir, dst_dir):
+            with os.scandir(src_dir) as it:
+                entries = [entry for entry in it if entry.name not in IGNORE_NAMES]
+            with os.scandir(dst_dir) as it:
+                dst_entries = {entry.name: entry for entry in it}
+
+            # Remove anything that is no longer in the source
+            src_names = {entry.name for entry in entries}
+            for name, dst_entry in dst_entries.items():
+                if name not in src_names:
+                    remove_path(dst_entry.path, dst_entry.is_dir(follow_symlinks=False))
+
+            copy_list = []
+            for entry in entries:
+                dst_path = os.path.join(dst_dir, entry.name)
+                dst_entry = dst_entries.get(entry.name)
+                dst_is_dir = dst_entry is not None and dst_entry.is_dir(follow_symlinks=False)
+                # follow symlinks; copy actual files
+                if entry.is_dir():
+                    if dst_entry is not None and not dst_is_dir:
+                        os.unlink(dst_path)
+                    os.makedirs(dst_path, exist_ok=True)
+                    futures.append(executor.submit(sync_dir, entry.path, dst_path))
+                else:
+                    if dst_is_dir:
+                        shutil.rmtree(dst_path)
+                    elif dst_entry is not None:
+                        src_stat = entry.stat()
+                        dst_stat = dst_entry.stat(follow_symlinks=False)
+                        if src_stat.st_size == dst_stat.st_size and \
+                           src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+                            continue
+                    copy_list.append((entry.path, dst_path))
+            for index in range(0, len(copy_list), COPY_BATCH_SIZE):
+                futures.append(executor.submit(link_or_copy_batch, copy_list[index:index + COPY_BATCH_SIZE]))
+
+        sync_dir(src, dst)
+        # Drain the futures so that any exception raised in a worker thread
+        # is raised here. New futures may be added while draining.
+        index = 0
+        while index < len(futures):
+            futures[index].result()
+            index += 1
+
+
+def main():
+    os.makedirs(DEST_EXAMPLES_FOLDER, exist_ok=True)
+    synctree_multithreaded(SRC_EXAMPLES_FOLDER, DEST_EXAMPLES_FOLDER)
+
+
+if __name__ == "__main__":
+    main()
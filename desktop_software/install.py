@@ -11,15 +11,69 @@ Features:
 - install, uninstall, status and switch commands
 """
 
-import argparse
+import functools
 import json
+import os
 import platform
-import re
-import shutil
+import stat
 import subprocess
 import sys
 from pathlib import Path
 
+# These are fixed for the life of the process so they are determined once.
+_SYSTEM = platform.system()
+_IS_WIN = _SYSTEM == "Windows"
+_IS_LINUX = _SYSTEM == "Linux"
+_IS_MAC = _SYSTEM == "Darwin"
+
+_HOME = Path.home()
+_USER_BIN = _HOME / ".local" / "bin"
+_SYS_BIN = Path("/usr/local/bin")
+_DESKTOP_DIR = _HOME / ".local" / "share" / "applications"
+_MACOS_APP_DIR = _HOME / "Applications"   # this is where your installer puts .app
+
+# The Windows only modules are only imported on Windows.
+if _IS_WIN:
+    import ctypes
+    import winreg
+    from ctypes import wintypes
+
+    # Set the argument and return types once rather than having ctypes infer them on each call.
+    _SendMessageTimeoutW = ctypes.windll.user32.SendMessageTimeoutW
+    _SendMessageTimeoutW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPCWSTR,
+                                     wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)]
+    _SendMessageTimeoutW.restype = wintypes.LPARAM
+else:
+    ctypes = None
+    winreg = None
+    _SendMessageTimeoutW = None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_meta(version_path_str):
+    """@brief Read a versions install.json file. The parsed file is cached so that it
+              is only read once however many times it is needed. The cache must be
+              cleared (_load_meta.cache_clear()) when an install.json file is written.
+       @param version_path_str The version folder.
+       @return The install.json dict or None if it could not be read."""
+    try:
+        with open(os.path.join(version_path_str, "install.json"), "rb") as fd:
+            return json.loads(fd.read())
+    except Exception:
+        return None
+
+
+def _version_key(version):
+    """@brief Get a sort key for a version folder name so that versions are sorted
+              numerically (E.G 0.9 before 0.10). The installer only uses the standard
+              library so the packaging module is not used.
+       @param version The version string.
+       @return The sort key. Names that are not dot separated numbers sort last."""
+    try:
+        return (0, tuple(int(p) for p in version.split(".")), version)
+    except ValueError:
+        return (1, (), version)
+
 
 class Installer:
     APP_NAME = None
@@ -42,6 +96,20 @@ class Installer:
     HELP_ARG_2 = '--help'
     HELP_ARGS = (HELP_ARG_1, HELP_ARG_2)
 
+    # Executed by the venv python to install pip if missing and then run pip with the
+    # command line arguments. This checks for pip, installs pip (if required) and installs
+    # the wheel in a single python process.
+    PIP_INSTALL_SRC = (
+        "import importlib, importlib.util, sys\n"
+        "if importlib.util.find_spec('pip') is None:\n"
+        "    print('Installing pip into virtualenv...')\n"
+        "    import ensurepip\n"
+        "    ensurepip.bootstrap(upgrade=True)\n"
+        "    importlib.invalidate_caches()\n"
+        "from pip._internal.cli.main import main\n"
+        "sys.exit(main(sys.argv[1:]))\n"
+    )
+
     @staticmethod
     def GetInfoEscapeSeq():
         """@return the info level ANSI escape sequence."""
@@ -65,6 +133,10 @@ class Installer:
         if self.APP_NAME is None or self.CMD_DICT is None:
             raise Exception("BUG: Installer.APP_NAME and Installer.CMD_DICT must be defined in subclass of the Installer class.")
 
+        self._wheel_prefix = self.APP_NAME + "-"
+        # The commands that have a launcher icon, in CMD_DICT order.
+        self._launcher_cmds = tuple(cmd for cmd, attr_list in self.CMD_DICT.items() if attr_list[1])
+
         if handle_cmd_line:
             self.parse_args()
             self.process_cmdline()
@@ -86,6 +158,8 @@ class Installer:
             print('ERROR: {}'.format(text), file=sys.stderr)
 
     def parse_args(self):
+        default_base = str(_HOME / f".{self.APP_NAME}")
+
         # Check to see if the user entered a command
         user_help_request = False
         if set(Installer.HELP_ARGS) & set(sys.argv):
@@ -102,6 +176,14 @@ class Installer:
             if not self._cmd_found:
                 sys.argv.insert(1, Installer.INSTALL_ARG)
 
+        # The status command is parsed by hand as it may be called frequently
+        # (E.G --json polling) and building the argparse parser dominates its run time.
+        if len(sys.argv) > 1 and sys.argv[1] == Installer.STATUS_ARG:
+            self.args = self._parse_status_args(sys.argv[2:], default_base)
+            if self.args:
+                return
+
+        import argparse
         parser = argparse.ArgumentParser(description=f"{self.APP_NAME}: install is the default command.")
         sub = parser.add_subparsers(dest="command", required=True)
 
@@ -109,19 +191,20 @@ class Installer:
         p = sub.add_parser(Installer.INSTALL_ARG)
         p.add_argument("wheel", help="Path to the Python wheel (.whl)")
         p.add_argument("--version", help="Version being installed (auto-detected if omitted)", default=None)
-        p.add_argument("--base", help="Installation base path", default=str(Path.home() / f".{self.APP_NAME}"))
+        p.add_argument("--base", help="Installation base path", default=default_base)
         p.add_argument("--mode", choices=["user", "system"], default="user")
+        p.add_argument("--verbose", action="store_true", help="Show the pip output when installing the wheel")
 
         # Uninstall
         p = sub.add_parser(Installer.UNINSTALL_ARG)
         p.add_argument("--all", action="store_true", help="Remove all versions")
         p.add_argument("--version", help="Specific version to remove")
-        p.add_argument("--base", help="Installation base path", default=str(Path.home() / f".{self.APP_NAME}"))
+        p.add_argument("--base", help="Installation base path", default=default_base)
         p.add_argument("--mode", choices=["user", "system"], default="user")
 
         # Status
         p = sub.add_parser(Installer.STATUS_ARG)
-        p.add_argument("--base", help="Installation base path", default=str(Path.home() / f".{self.APP_NAME}"))
+        p.add_argument("--base", help="Installation base path", default=default_base)
         p.add_argument("--json", action="store_true", help="JSON output")
         p.add_argument("--mode", choices=["user", "system"], default="user")
 
@@ -129,11 +212,42 @@ class Installer:
         p = sub.add_parser(Installer.SWITCH_ARG)
         p.add_argument("version", nargs="?", help="Version to activate")
         p.add_argument("--latest", action="store_true", help="Switch to highest installed version")
-        p.add_argument("--base", default=str(Path.home() / f".{self.APP_NAME}"))
+        p.add_argument("--base", default=default_base)
         p.add_argument("--mode", choices=["user", "system"], default="user")
 
         self.args = parser.parse_args()
 
+    def _parse_status_args(self, argv, default_base):
+        """@brief Parse the status command arguments without using argparse.
+           @param argv The arguments following the status command.
+           @param default_base The default installation base path.
+           @return A namespace holding the parsed arguments or None if the arguments
+                   could not be parsed (argparse should then be used so that the
+                   user is presented with its help/error messages)."""
+        from types import SimpleNamespace
+        args = SimpleNamespace(command=Installer.STATUS_ARG, base=default_base, json=False, mode="user")
+        index = 0
+        while index < len(argv):
+            arg = argv[index]
+            if arg == "--json":
+                args.json = True
+            elif arg in ("--base", "--mode"):
+                index += 1
+                if index >= len(argv):
+                    return None
+                setattr(args, arg[2:], argv[index])
+            elif arg.startswith("--base=") or arg.startswith("--mode="):
+                name, value = arg[2:].split("=", 1)
+                setattr(args, name, value)
+            else:
+                return None
+            index += 1
+
+        if args.mode not in ("user", "system"):
+            return None
+
+        return args
+
     def process_cmdline(self):
         if self.args.command == "install":
             self.install()
@@ -155,34 +269,59 @@ class Installer:
         sys.exit(1)
 
     def get_bin_dir(self, mode):
-        system = platform.system()
-        if system == "Windows":
+        if _IS_WIN:
             return (
-                Path.home() / "AppData" / "Local" / "Programs" / self.APP_NAME / "bin"
+                _HOME / "AppData" / "Local" / "Programs" / self.APP_NAME / "bin"
                 if mode == "user"
                 else Path("C:/Program Files") / self.APP_NAME / "bin"
             )
         else:
-            return Path.home() / ".local" / "bin" if mode == "user" else Path("/usr/local/bin")
+            return _USER_BIN if mode == "user" else _SYS_BIN
 
     def get_desktop_dir(self):
-        return Path.home() / ".local" / "share" / "applications"
+        return _DESKTOP_DIR
 
     def get_macos_app_dir(self):
-        return Path.home() / "Applications"   # this is where your installer puts .app
+        return _MACOS_APP_DIR
+
+    def get_base(self):
+        """@brief Get the installation base folder from the command line.
+                  os.path.abspath() is used rather than Path.resolve() as it normalizes
+                  the path without a readlink/stat call for every path component.
+                  Symlinks in the path are therefore not resolved. Earlier installs
+                  used the resolved path (see link_points_into()).
+           @return The absolute base folder."""
+        return Path(os.path.abspath(os.path.expanduser(self.args.base)))
+
+    def iter_versions(self, base):
+        """@brief Get the installed versions in no particular order. Use this where
+                  the order does not matter as no sort is needed.
+           @param base The installation base path.
+           @return A generator of version folder names."""
+        # DirEntry.is_dir() uses the file type returned when the folder is read
+        # so no stat call is needed per entry. The current symlink is not followed.
+        try:
+            with os.scandir(base) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False) and e.name != "current":
+                        yield e.name
+        except FileNotFoundError:
+            return
 
     def all_versions(self, base):
-        return sorted(
-            d.name for d in base.iterdir()
-            if d.is_dir() and d.name != "current"
-        )
+        """@return The installed versions, oldest first."""
+        return sorted(self.iter_versions(base), key=_version_key)
 
     def detect_version_from_wheel(self, wheel_path: Path):
+        # Wheel filenames are {name}-{version}-{tags}.whl (PEP 427)
         # Example: mpy_tool-0.45-py3-none-any.whl → 0.45
-        m = re.search(rf"{self.APP_NAME}-(\d+(?:\.\d+)*)", wheel_path.name)
-        if not m:
-            self.die(f"Could not auto-detect version from wheel filename '{wheel_path.name}'")
-        return m.group(1)
+        name = wheel_path.name
+        version, sep = "", ""
+        if name.startswith(self._wheel_prefix):
+            version, sep, _ = name[len(self._wheel_prefix):].partition("-")
+        if not sep or not all(p.isdecimal() for p in version.split(".")):
+            self.die(f"Could not auto-detect version from wheel filename '{name}'")
+        return version
 
     def select_version(self, base: Path, requested: str | None, latest: bool):
         versions = self.all_versions(base)
@@ -206,44 +345,80 @@ class Installer:
         Works even if install.json is missing.
         """
         bin_dir = self.get_bin_dir(mode)
-        system = platform.system()
 
-        if not bin_dir.exists():
+        if _IS_WIN:
+            # The .bat launchers are named after the commands recorded in each
+            # versions install.json so there is no need to read every .bat file.
+            owned = set(self.CMD_DICT)
+            for v in self.iter_versions(base):
+                owned.update(self.get_installed_commands(base / v))
+            for cmd in owned:
+                bat = bin_dir / f"{cmd}.bat"
+                if os.path.lexists(bat):
+                    os.unlink(bat)
             return
 
-        for p in bin_dir.iterdir():
-            if system == "Windows" and p.suffix == ".bat":
-                txt = p.read_text(errors="ignore")
-                if str(base) in txt:
-                    p.unlink()
-            else:
-                if p.is_symlink():
-                    try:
-                        resolved = p.resolve()
-                        if resolved.is_relative_to(base):
-                            p.unlink()
-                    except Exception:
-                        pass
+        base_prefix = str(base) + os.sep
+        try:
+            with os.scandir(bin_dir) as it:
+                entries = list(it)
+        except FileNotFoundError:
+            return
+
+        for e in entries:
+            if e.is_symlink():
+                try:
+                    if self.link_points_into(e.path, base_prefix):
+                        os.unlink(e.path)
+                except Exception:
+                    pass
+
+    def link_points_into(self, link, folder_prefix):
+        """@brief Check if a symlink points to a path inside a folder. The link is read
+                  with a single os.readlink() call rather than resolving every component
+                  of its path.
+                  If this check fails the real paths are compared as the target or folder
+                  may be reached through a symlink (E.G links created by an earlier install
+                  that used the resolved base folder).
+           @param link The symlink.
+           @param folder_prefix The absolute folder path followed by os.sep.
+           @return True if the symlink target is inside the folder."""
+        target = os.path.normpath(os.path.join(os.path.dirname(link), os.readlink(link)))
+        if target.startswith(folder_prefix):
+            return True
+        # Only the target folder is resolved so that a target that is itself a symlink
+        # (E.G the venv python) is not followed out of the folder.
+        real_target = os.path.join(os.path.realpath(os.path.dirname(target)), os.path.basename(target))
+        return real_target.startswith(os.path.realpath(folder_prefix) + os.sep)
 
     def remove_active_gui_launchers(self, base: Path):
-        system = platform.system()
-
-        if system == "Linux":
-            d = self.get_desktop_dir()
-            if d.exists():
-                for f in d.glob("*.desktop"):
-                    txt = f.read_text(errors="ignore")
-                    if str(base) in txt:
-                        f.unlink()
-
-        if system == "Darwin":
-            d = self.get_macos_app_dir()
-            if d.exists():
-                for app in d.glob("*.app"):
-                    shutil.rmtree(app, ignore_errors=True)
+        if _IS_LINUX:
+            # Launchers created by an earlier install may hold the resolved base path.
+            base_strs = {str(base), os.path.realpath(base)}
+            for e in self.scandir_suffix(self.get_desktop_dir(), ".desktop"):
+                with open(e.path, errors="ignore") as fd:
+                    txt = fd.read()
+                if any(base_str in txt for base_str in base_strs):
+                    os.unlink(e.path)
+
+        if _IS_MAC:
+            import shutil
+            for e in self.scandir_suffix(self.get_macos_app_dir(), ".app"):
+                shutil.rmtree(e.path, ignore_errors=True)
+
+    def scandir_suffix(self, folder, suffix):
+        """@brief Read a folder once and return the (non hidden) entries with a name ending in suffix.
+           @param folder The folder to read. If it does not exist no entries are returned.
+           @param suffix The required name suffix (E.G '.desktop').
+           @return A list of os.DirEntry instances."""
+        try:
+            with os.scandir(folder) as it:
+                return [e for e in it if e.name.endswith(suffix) and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
 
     def switch_version(self):
-        base = Path(self.args.base).resolve()
+        base = self.get_base()
         version = self.select_version(base, self.args.version, self.args.latest)
 
         self.info(f"Switching {self.APP_NAME} to version {version}")
@@ -266,92 +441,199 @@ class Installer:
 
     def create_venv(self, venv_path: Path, python=sys.executable):
         if not venv_path.exists():
-            subprocess.check_call([python, "-m", "venv", str(venv_path)])
-
-    def install_wheel(self, venv_path: Path, wheel: Path):
-        python_exe = venv_path / ("Scripts/python.exe" if platform.system() == "Windows" else "bin/python")
-        subprocess.check_call([str(python_exe), "-m", "pip", "install", "--upgrade", str(wheel)])
+            # If another version is installed clone its venv. This is much faster
+            # than creating a new venv and installing pip and all the dependencies into it.
+            # Not on Windows as the console script launchers there are binary files
+            # holding the venv path that cannot be updated.
+            src_venv = None if _IS_WIN else self.find_venv_to_clone(venv_path)
+            if src_venv:
+                try:
+                    self.clone_venv(src_venv, venv_path)
+                    return
+                except Exception as ex:
+                    self.info(f"Unable to clone {src_venv} ({ex}), creating a new virtualenv.")
+                    import shutil
+                    shutil.rmtree(venv_path, ignore_errors=True)
+            uv = self.get_uv()
+            if uv:
+                # uv creates the venv much faster as it does not install pip into it.
+                subprocess.check_call([uv, "venv", "--quiet", "--python", python, str(venv_path)])
+            elif python == sys.executable:
+                # Create the venv in this process rather than starting another python
+                # process. pip is installed (if missing) by the same venv python process
+                # that installs the wheel (see install_wheel()).
+                import venv
+                # Symlink the interpreter (except on Windows) as "python -m venv" does.
+                venv.EnvBuilder(with_pip=False, symlinks=(os.name != "nt")).create(str(venv_path))
+            else:
+                subprocess.check_call([python, "-m", "venv", str(venv_path)])
+
+    def get_uv(self):
+        """@return The path to the uv executable or None if uv is not installed.
+                   If available uv is used to create the venv and install the wheel."""
+        if not hasattr(self, "_uv"):
+            import shutil
+            self._uv = shutil.which("uv")
+        return self._uv
+
+    def find_venv_to_clone(self, venv_path: Path):
+        """@brief Find the venv of another installed version.
+           @param venv_path The venv to be created (base/version/venv).
+           @return The venv of the highest other installed version or None if not found."""
+        base = venv_path.parent.parent
+        if not base.exists():
+            return None
+        for version in reversed(self.all_versions(base)):
+            src_venv = base / version / "venv"
+            if src_venv != venv_path and src_venv.is_dir():
+                return src_venv
+        return None
+
+    def clone_venv(self, src_venv: Path, venv_path: Path):
+        """@brief Create a venv by cloning an existing one. Files are hard linked
+                  where possible so that almost no data is copied. pip replaces
+                  (rather than modifies) files when the wheel is installed so the
+                  source venv is not changed. Any packages installed in the source
+                  venv that the new wheel no longer depends on are carried over.
+                  Not used on Windows (see create_venv()).
+           @param src_venv The existing venv.
+           @param venv_path The venv to create."""
+        import shutil
+
+        def link_or_copy(src, dst):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+        self.info(f"Cloning {src_venv} to {venv_path}")
+        shutil.copytree(src_venv, venv_path, symlinks=True, copy_function=link_or_copy)
+
+        # The activate scripts, console scripts and pyvenv.cfg hold the absolute venv path.
+        old = str(src_venv).encode()
+        new = str(venv_path).encode()
+        scripts_dir = venv_path / ("Scripts" if _IS_WIN else "bin")
+        for f in list(scripts_dir.iterdir()) + [venv_path / "pyvenv.cfg"]:
+            if f.is_symlink() or not f.is_file():
+                continue
+            data = f.read_bytes()
+            if old not in data:
+                continue
+            try:
+                data.decode()
+            except UnicodeDecodeError:
+                # Leave binary files unchanged as they cannot be safely edited.
+                continue
+            mode = f.stat().st_mode
+            # Unlink first so that the hard linked file in the source venv is not changed.
+            f.unlink()
+            f.write_bytes(data.replace(old, new))
+            f.chmod(mode)
+
+    def install_wheel(self, venv_path: Path, wheel: Path, verbose=False):
+        """@brief Install the wheel into the venv. If uv is not used then pip is
+                  installed into the venv first if it is missing.
+           @param venv_path The venv to install into.
+           @param wheel The wheel file.
+           @param verbose If False the pip output is discarded. pip's stderr output
+                          is shown if it fails."""
+        python_exe = venv_path / ("Scripts/python.exe" if _IS_WIN else "bin/python")
+        uv = self.get_uv()
+        if uv:
+            cmd = [uv, "pip", "install", "--python", str(python_exe)]
+        else:
+            # --no-compile as python compiles the installed .py files on first use.
+            cmd = [str(python_exe), "-c", Installer.PIP_INSTALL_SRC, "install", "--upgrade",
+                   "--no-compile", "--disable-pip-version-check", "--no-input",
+                   "--no-warn-script-location"]
+        if verbose:
+            subprocess.check_call(cmd + [str(wheel)])
+        else:
+            cmd += ["--quiet", str(wheel)]
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                sys.stderr.write(result.stderr.decode(errors="replace"))
+                raise subprocess.CalledProcessError(result.returncode, cmd)
 
     def remove_launchers_for_version(self, base, version, mode):
         bin_dir = self.get_bin_dir(mode)
         desktop_dir = self.get_desktop_dir()
         mac_app_dir = self.get_macos_app_dir()
 
-        meta_file = base / version / "install.json"
-        if not meta_file.exists():
+        meta = _load_meta(str(base / version))
+        if meta is None:
             return
 
-        meta = json.loads(meta_file.read_text())
         cmds = meta["commands"]
 
-        for cmd in cmds:
-            # Linux/macOS shell wrappers
-            p = bin_dir / cmd
-            if p.exists() or p.is_symlink():
-                try:
-                    target = p.resolve()
-                    if str(base / version) in str(target):
-                        p.unlink()
-                except Exception:
-                    pass
+        version_prefix = str(base / version) + os.sep
 
-            # Linux .desktop files
-            desktop = desktop_dir / f"{cmd}.desktop"
-            if desktop.exists():
-                desktop.unlink()
+        # Linux/macOS shell wrappers
+        for e in self.scandir_names(bin_dir, set(cmds)):
+            try:
+                if self.link_points_into(e.path, version_prefix):
+                    os.unlink(e.path)
+            except Exception:
+                pass
 
-            # macOS .app bundles
-            app = mac_app_dir / f"{cmd}.app"
-            if app.exists():
-                shutil.rmtree(app, ignore_errors=True)
+        # Linux .desktop files
+        for e in self.scandir_names(desktop_dir, {f"{cmd}.desktop" for cmd in cmds}):
+            os.unlink(e.path)
+
+        # macOS .app bundles
+        for e in self.scandir_names(mac_app_dir, {f"{cmd}.app" for cmd in cmds}):
+            import shutil
+            shutil.rmtree(e.path, ignore_errors=True)
 
     def remove_windows_launchers(self, mode):
         bin_dir = self.get_bin_dir(mode)
-        if not bin_dir.exists():
-            return
-        for cmd in self.CMD_DICT:
-            bat = bin_dir / f"{cmd}.bat"
-            if bat.exists():
-                bat.unlink()
+        for e in self.scandir_names(bin_dir, {f"{cmd}.bat" for cmd in self.CMD_DICT}):
+            os.unlink(e.path)
+
+    def scandir_names(self, folder, names):
+        """@brief Read a folder once and return the entries with the required names.
+           @param folder The folder to read. If it does not exist no entries are returned.
+           @param names A set of the required entry names.
+           @return A list of os.DirEntry instances."""
+        try:
+            with os.scandir(folder) as it:
+                return [e for e in it if e.name in names]
+        except FileNotFoundError:
+            return []
 
     def remove_from_user_path(self, dir_to_remove):
         dir_to_remove = str(dir_to_remove).lower().rstrip("\\")
-        current = self.get_user_path()
-        parts = [p for p in current.split(";") if p]
 
-        new_parts = []
-        for p in parts:
-            if p.lower().rstrip("\\") != dir_to_remove:
-                new_parts.append(p)
+        def mutator(current):
+            parts = [p for p in current.split(";") if p]
 
-        new = ";".join(new_parts)
-        if new != current:
-            self.set_user_path(new)
-            return True
-        return False
+            new_parts = []
+            for p in parts:
+                if p.lower().rstrip("\\") != dir_to_remove:
+                    new_parts.append(p)
+
+            return ";".join(new_parts)
+
+        return self._update_user_path(mutator)
 
     def load_install_record(self, version_path: Path):
-        f = version_path / "install.json"
-        if not f.exists():
+        meta = _load_meta(str(version_path))
+        if meta is None:
             self.die(f"Missing install.json in {version_path}")
-        return json.loads(f.read_text())
+        return meta
 
     def get_installed_commands(self, version_path: Path):
         """
         Return list of commands belonging to this version.
         Works even if install.json is missing.
         """
-        meta = version_path / "install.json"
-        if meta.exists():
-            try:
-                data = json.loads(meta.read_text())
-                return data.get("commands", [])
-            except Exception:
-                pass
+        meta = _load_meta(str(version_path))
+        if meta is not None and "commands" in meta:
+            return meta["commands"]
 
         # Fallback: inspect venv/bin
         venv = version_path / "venv"
-        if platform.system() == "Windows":
+        if _IS_WIN:
             bin_dir = venv / "Scripts"
             exts = (".exe", ".bat", ".cmd")
         else:
@@ -359,12 +641,17 @@ class Installer:
             exts = ("",)
 
         cmds = []
-        if bin_dir.exists():
-            for p in bin_dir.iterdir():
-                for ext in exts:
-                    if p.name == p.stem + ext:
-                        if p.stem in self.CMD_DICT:
-                            cmds.append(p.stem)
+        try:
+            with os.scandir(bin_dir) as it:
+                for e in it:
+                    stem, ext = os.path.splitext(e.name)
+                    if ext in exts and stem in self.CMD_DICT:
+                        cmds.append(stem)
+        except FileNotFoundError:
+            pass
+
+        if cmds:
+            return cmds
 
         # Final fallback (very old installs)
         return list(self.CMD_DICT.keys())
@@ -373,30 +660,44 @@ class Installer:
         """@brief Determine if a launcher icon is required.
            @param cmd The cmd to check.
            @return True if required."""
-        launcher_required = False
-        if cmd in self.CMD_DICT:
-            attr_list = self.CMD_DICT[cmd]
-            launcher_required = attr_list[1]
-        return launcher_required
-
-    def remove_version(self, version: str, base: Path, mode: str):
+        return cmd in self._launcher_cmds
+
+    def remove_version(self, version: str, base: Path, mode: str, remove_tree=True):
+        """@brief Remove an installed version and its launchers.
+           @param version The version to remove.
+           @param base The installation base path.
+           @param mode user or system.
+           @param remove_tree If False the launchers are removed but the caller is
+                              responsible for removing the version folder.
+           @return True if the version was found."""
         version_path = base / version
         if not version_path.exists():
             self.info(f"Version {version} not found")
-            return
+            return False
 
-        system = platform.system()
         bin_dir = self.get_bin_dir(mode)
         mac_app_dir = self.get_macos_app_dir()
 
         commands = self.get_installed_commands(version_path)
+        # base is an absolute normalized path (not necessarily a real path, see
+        # link_points_into()) so version_path is too.
+        version_str = str(version_path)
+        version_prefix = version_str + os.sep
+        # Build the launcher paths from strings rather than Path objects in the loop.
+        bin_prefix = str(bin_dir) + os.sep
+        app_prefix = str(mac_app_dir) + os.sep
 
         for cmd in commands:
             # ----- CLI launchers -----
-            launcher = bin_dir / cmd
-            if system == "Windows" and not launcher.name.endswith(".bat"):
-                launcher = launcher.with_name(launcher.name + ".bat")
-            if launcher.exists() or launcher.is_symlink():
+            launcher = bin_prefix + cmd
+            if _IS_WIN and not launcher.endswith(".bat"):
+                launcher += ".bat"
+            # A single lstat tells us if the launcher exists and what type it is.
+            try:
+                st = os.lstat(launcher)
+            except FileNotFoundError:
+                st = None
+            if st is not None:
 
                 # If gui is in the cmd name then we would have tried to create a icon launcher when it was installed.
                 if self._is_launcher_required(cmd):
@@ -409,49 +710,129 @@ class Installer:
                         pass
 
                 try:
-                    target = launcher.resolve()
-                    # If this is a link to a file in the venv
-                    if str(version_path) in str(target):
-                        launcher.unlink()
-                        self.info(f"Removed {launcher}")
-
-                    # If this is a startup file in the ~/.local folder
-                    elif target.is_file():
-                        launcher.unlink()
+                    if stat.S_ISLNK(st.st_mode):
+                        # If this is a link to a file in the venv
+                        remove = self.link_points_into(launcher, version_prefix) or os.path.isfile(launcher)
+                    else:
+                        # If this is a startup file in the ~/.local folder
+                        remove = stat.S_ISREG(st.st_mode)
+                    if remove:
+                        os.unlink(launcher)
                         self.info(f"Removed {launcher}")
 
                 except Exception:
-                    launcher.unlink(missing_ok=True)
+                    try:
+                        os.unlink(launcher)
+                    except FileNotFoundError:
+                        pass
 
             # Windows .bat
-            if system == "Windows":
-                bat = bin_dir / f"{cmd}.bat"
-                if bat.exists():
-                    txt = bat.read_text(errors="ignore")
-                    if str(version_path) in txt:
-                        bat.unlink()
+            if _IS_WIN:
+                bat = bin_prefix + cmd + ".bat"
+                if os.path.exists(bat):
+                    # The venv path is set near the start of the .bat file.
+                    with open(bat, "rb") as fd:
+                        head = fd.read(1024).decode(errors="ignore")
+                    if version_str in head:
+                        os.unlink(bat)
                         self.info(f"Removed {bat}")
 
             # macOS .app
-            if system == "Darwin":
-                app = mac_app_dir / f"{cmd}.app"
-                if app.exists():
+            if _IS_MAC:
+                app = app_prefix + cmd + ".app"
+                if os.path.exists(app):
+                    import shutil
                     shutil.rmtree(app, ignore_errors=True)
                     self.info(f"Removed {app}")
 
-        shutil.rmtree(version_path, ignore_errors=True)
-        self.info(f"Removed version {version}")
+        if remove_tree:
+            self.fast_rmtree(version_path)
+            self.info(f"Removed version {version}")
+        return True
+
+    def fast_rmtree(self, path: Path):
+        """@brief Remove a folder tree (e.g a venv holding many files). Errors are ignored.
+                  Where supported os.fwalk() is used so that each entry is removed
+                  relative to an open folder file descriptor rather than by resolving
+                  its full path. Elsewhere (Windows) an os.scandir() walk is used that
+                  takes the entry type from the folder listing rather than a stat call.
+           @param path The folder to remove."""
+        if hasattr(os, "fwalk") and {os.unlink, os.rmdir} <= os.supports_dir_fd:
+            try:
+                for _, dirs, files, root_fd in os.fwalk(path, topdown=False):
+                    for name in files:
+                        os.unlink(name, dir_fd=root_fd)
+                    for name in dirs:
+                        try:
+                            os.rmdir(name, dir_fd=root_fd)
+                        except NotADirectoryError:
+                            # A symlink to a folder
+                            os.unlink(name, dir_fd=root_fd)
+                os.rmdir(path)
+                return
+            except OSError:
+                pass
+        else:
+            try:
+                self._scandir_rmtree(path)
+                return
+            except OSError:
+                pass
+        # An error occurred, remove what we can.
+        import shutil
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _is_junction(self, e):
+        """@param e An os.DirEntry instance.
+           @return True if the entry is a Windows directory junction."""
+        if hasattr(e, "is_junction"):
+            # Python 3.12 or later
+            return e.is_junction()
+        if not _IS_WIN:
+            return False
+        mount_point_tag = getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", 0xA0000003)
+        return e.stat(follow_symlinks=False).st_reparse_tag == mount_point_tag
+
+    def _scandir_rmtree(self, path):
+        """@brief Remove a folder tree using os.scandir(). Errors are raised.
+           @param path The folder to remove."""
+        with os.scandir(path) as it:
+            entries = list(it)
+        for e in entries:
+            # Symlinks to folders and Windows directory junctions are removed, not followed.
+            # is_dir(follow_symlinks=False) is True for a junction so this is checked first.
+            if self._is_junction(e):
+                os.rmdir(e.path)
+            elif e.is_dir(follow_symlinks=False):
+                self._scandir_rmtree(e.path)
+            else:
+                try:
+                    os.unlink(e.path)
+                except PermissionError:
+                    if not e.is_symlink():
+                        raise
+                    # A Windows folder symlink
+                    os.rmdir(e.path)
+        os.rmdir(path)
 
     def uninstall(self):
-        base = Path(self.args.base).resolve()
+        base = self.get_base()
 
         if not base.exists():
             self.info("Nothing installed")
             return
 
         if self.args.all:
-            for v in self.all_versions(base):
-                self.remove_version(v, base, self.args.mode)
+            # The launchers are shared between versions so these are removed serially.
+            versions = [v for v in self.iter_versions(base)
+                        if self.remove_version(v, base, self.args.mode, remove_tree=False)]
+            # Removing the version folders (each holding a venv) is independent,
+            # I/O bound work so it is done in parallel.
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as executor:
+                list(executor.map(self.fast_rmtree, [base / v for v in versions]))
+            for v in versions:
+                self.info(f"Removed version {v}")
             return
 
         if self.args.version:
@@ -461,62 +842,135 @@ class Installer:
         self.die("Specify --all or --version")
 
     def get_machine_path(self):
-        import winreg
         with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, Installer.ENV_KEY) as k:
             return winreg.QueryValueEx(k, "Path")[0]
 
-    def get_user_path(self):
-        import winreg
+    def open_user_env_key(self):
+        """@brief Open (creating if required) the users environment registry key
+                  with both query and set access so that the PATH can be read and
+                  written using a single key handle.
+           @return The winreg key handle."""
+        return winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, "Environment", 0,
+                                  winreg.KEY_QUERY_VALUE | winreg.KEY_SET_VALUE)
+
+    def get_user_path(self, key=None):
         try:
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment") as k:
-                return winreg.QueryValueEx(k, "Path")[0]
+            if key is None:
+                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment") as k:
+                    return winreg.QueryValueEx(k, "Path")[0]
+            return winreg.QueryValueEx(key, "Path")[0]
         except FileNotFoundError:
             return ""
 
-    def set_user_path(self, value):
-        import winreg
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0, winreg.KEY_SET_VALUE) as k:
-            winreg.SetValueEx(k, "Path", 0, winreg.REG_EXPAND_SZ, value)
-
-    def add_to_user_path(self, dir_to_add):
-        # Ensure string
-        dir_to_add = str(dir_to_add)
-
-        current = self.get_user_path()
-
-        parts = [p for p in current.split(";") if p]
-
-        norm = [p.lower().rstrip("\\") for p in parts]
-        target = dir_to_add.lower().rstrip("\\")
-
-        if target in norm:
-            return False   # already present
-
-        new = current + (";" if current and not current.endswith(";") else "") + dir_to_add
-        self.set_user_path(new)
+    def set_user_path(self, value, key=None):
+        if key is None:
+            with self.open_user_env_key() as k:
+                winreg.SetValueEx(k, "Path", 0, winreg.REG_EXPAND_SZ, value)
+        else:
+            winreg.SetValueEx(key, "Path", 0, winreg.REG_EXPAND_SZ, value)
+
+    def add_to_user_path(self, dirs_to_add):
+        """@brief Add folders to the users PATH. The PATH is read and written once
+                  regardless of the number of folders added.
+           @param dirs_to_add A list of the folders to add.
+           @return True if the PATH was changed."""
+        def mutator(current):
+            parts = [p for p in current.split(";") if p]
+
+            norm = {p.lower().rstrip("\\") for p in parts}
+
+            new_dirs = []
+            for dir_to_add in dirs_to_add:
+                # Ensure string
+                dir_to_add = str(dir_to_add)
+                target = dir_to_add.lower().rstrip("\\")
+                if target not in norm:
+                    norm.add(target)
+                    new_dirs.append(dir_to_add)
+
+            if not new_dirs:
+                return current   # already present
+
+            return current + (";" if current and not current.endswith(";") else "") + ";".join(new_dirs)
+
+        return self._update_user_path(mutator)
+
+    def _update_user_path(self, mutator):
+        """@brief Read, modify and write the users PATH using a single registry key handle.
+                  The PATH is only written (and the change broadcast) if it changes.
+           @param mutator A function that is passed the current PATH and returns the new PATH.
+           @return True if the PATH was changed."""
+        with self.open_user_env_key() as k:
+            current = self.get_user_path(k)
+            new = mutator(current)
+            if new == current:
+                return False
+            self.set_user_path(new, k)
+
+        self.broadcast_env_change()
         return True
 
-    def ask_reboot(self):
-        import ctypes
-
-        MB_ICONQUESTION = 0x20
-        MB_YESNO = 0x04
-        MB_DEFBUTTON2 = 0x100
-        MB_SYSTEMMODAL = 0x1000
-
-        result = ctypes.windll.user32.MessageBoxW(
-            None,
-            "MPY Tool has been added to your PATH.\n\n"
-            "Windows needs to restart Explorer (or reboot) for this to take effect.\n\n"
-            "Restart the computer now?",
-            "MPY Tool installation",
-            MB_ICONQUESTION | MB_YESNO | MB_DEFBUTTON2 | MB_SYSTEMMODAL
+    def broadcast_env_change(self):
+        """@brief Notify all top level windows (Explorer included) that the environment
+                  has changed so that new processes pick up the updated PATH without
+                  a reboot."""
+        HWND_BROADCAST = 0xFFFF
+        WM_SETTINGCHANGE = 0x001A
+        SMTO_ABORTIFHUNG = 0x0002
+
+        result = ctypes.c_size_t()  # DWORD_PTR
+        _SendMessageTimeoutW(
+            HWND_BROADCAST,
+            WM_SETTINGCHANGE,
+            0,
+            "Environment",
+            SMTO_ABORTIFHUNG,
+            5000,
+            ctypes.byref(result)
         )
 
-        if result == 6:  # YES
-            ctypes.windll.shell32.ShellExecuteW(
-                None, "runas", "shutdown", "/r /t 5", None, 1
-            )
+    def _write_launcher(self, launcher_file):
+        """@brief Write a launcher file. Files and symlinks are created under a temporary
+                  name and then renamed with os.replace() so that an existing launcher
+                  is atomically replaced and never written through.
+           @param launcher_file A (path, contents, mode, link) tuple.
+                                path     The file to write.
+                                contents The text to write to the file.
+                                mode     If not None the file permissions.
+                                link     If not None the path of a symlink to create that points to path."""
+        path, contents, mode, link = launcher_file
+        tmp_path = self.tmp_path(path)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+        fd = os.open(tmp_path, flags, 0o666 if mode is None else mode)
+        try:
+            os.write(fd, contents.encode())
+            if mode is not None:
+                # The mode passed to os.open() is masked by the umask.
+                os.fchmod(fd, mode)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+
+        if link is not None:
+            tmp_link = self.tmp_path(link)
+            tmp_link.unlink(missing_ok=True)
+            tmp_link.symlink_to(path)
+            os.replace(tmp_link, link)
+
+    def tmp_path(self, path: Path):
+        """@return A hidden temporary path in the same folder as path. This is renamed
+                   over path using os.replace() to atomically replace it."""
+        return path.with_name(f".{path.name}.tmp-{os.getpid()}")
+
+    def _write_launchers(self, launcher_files):
+        """@brief Write launcher files in parallel as they are independent.
+           @param launcher_files A list of (path, contents, mode, link) tuples. See _write_launcher()."""
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self._write_launcher, launcher_files))
+
+        for path, _, _, link in launcher_files:
+            self.info(f"Created {link if link is not None else path}")
 
     def create_launchers(self, base: Path, version: str, venv_path: Path):
         """
@@ -527,9 +981,10 @@ class Installer:
                         or the venv-installed console scripts, with symlinks in bin_dir.
         """
 
-        system = platform.system()
         bin_dir = self.get_bin_dir(self.args.mode)
-        if system == "Windows":
+        # (path, contents, mode, link) tuples. See _write_launcher()
+        launcher_files = []
+        if _IS_WIN:
             bin_dir.mkdir(parents=True, exist_ok=True)
 
             venv_dir = str(venv_path)
@@ -538,88 +993,84 @@ class Installer:
                 module_target = attr_list[0]
                 launcher = bin_dir / f"{cmd}.bat"
                 if module_target:
-                    launcher.write_text(
-                        f"""@echo off
+                    contents = f"""@echo off
 set VENV_DIR={venv_dir}
 call "%VENV_DIR%\\Scripts\\activate.bat"
 python -m {module_target} %*
-""")
+"""
 
                 else:
-                    launcher.write_text(
-                        f"""@echo off
+                    contents = f"""@echo off
 set VENV_DIR={venv_dir}
 call "%VENV_DIR%\\Scripts\\activate.bat"
 python -m {self.APP_NAME}.{cmd} %*
-""")
-                self.info(f"Created {launcher}")
+"""
+                launcher_files.append((launcher, contents, None, None))
+
+            self._write_launchers(launcher_files)
 
             # Ensure the bin folder is on the system PATH
-            path_changed = self.add_to_user_path(bin_dir)
+            path_changed = self.add_to_user_path([bin_dir])
 
             if path_changed:
-                self.ask_reboot()
+                self.info(f"Added {bin_dir} to your PATH. Open a new terminal window to use it.")
 
         else:
             # Linux / macOS
             bin_dir.mkdir(parents=True, exist_ok=True)
 
             wrapper_dir = base / version / "launchers"
-            wrapper_dir.mkdir(parents=True, exist_ok=True)
+            # Wrapper scripts are only needed for commands that use the venv console script.
+            if not all(attr_list[0] for attr_list in self.CMD_DICT.values()):
+                wrapper_dir.mkdir(parents=True, exist_ok=True)
 
-            python_exe = venv_path / "bin" / "python"
+            # The parts of the scripts that are the same for every command.
+            venv_bin = str(venv_path / "bin") + os.sep
+            module_header = f"""#!/bin/sh
+exec "{venv_bin}python" -m """
 
             for cmd, attr_list in self.CMD_DICT.items():
                 module_target = attr_list[0]
                 if module_target:
                     # Command needs python -m module
                     launcher = bin_dir / cmd
-                    contents = f"""#!/bin/sh
-exec "{python_exe}" -m {module_target} "$@"
-"""
-                    launcher.write_text(contents)
-                    launcher.chmod(0o755)
+                    contents = module_header + module_target + ' "$@"\n'
+                    launcher_files.append((launcher, contents, 0o755, None))
                 else:
                     # Use the venv-installed console script
-                    entrypoint = venv_path / "bin" / cmd
-                    if not entrypoint.exists():
+                    entrypoint = venv_bin + cmd
+                    if not os.path.exists(entrypoint):
                         self.die(f"Entrypoint {cmd} not found in venv at {entrypoint}")
 
                     wrapper_script = wrapper_dir / f"{cmd}.sh"
-                    wrapper_script.write_text(f"""#!/bin/sh
+                    contents = f"""#!/bin/sh
 exec "{entrypoint}" "$@"
-""")
-                    wrapper_script.chmod(0o755)
-
-                    launcher = bin_dir / cmd
-                    if launcher.exists() or launcher.is_symlink():
-                        launcher.unlink()
-                    launcher.symlink_to(wrapper_script)
+"""
+                    launcher_files.append((wrapper_script, contents, 0o755, bin_dir / cmd))
 
-                self.info(f"Created {launcher}")
+            self._write_launchers(launcher_files)
 
             # Optional: create .desktop files for GUI commands
-            desktop_dir = Path.home() / ".local" / "share" / "applications"
-            desktop_dir.mkdir(parents=True, exist_ok=True)
-
-        for cmd, attr_list in self.CMD_DICT.items():
-            module_target = attr_list[0]
-            # If the command starts a gui
-            if self._is_launcher_required(cmd):
-                # Try running it with the --add_launcher argument (see p3lib launcher.py)
-                # This supports creation of a GUI launcher with an icon on
-                # Linux, Windows and macos platforms.
-                # On Windows and macos an icon is created on the desktop.
-                # On Linux platforms a gnome application launcher is created.
-                try:
-                    full_cmd = bin_dir / cmd
-                    if system == "Windows" and not full_cmd.name.endswith(".bat"):
-                        full_cmd = full_cmd.with_name(full_cmd.name + ".bat")
-                    if full_cmd.exists():
-                        subprocess.check_call([full_cmd, "--add_launcher"])
-                except Exception:
-                    # Fail silently as cmd may not support the create gui launcher functionality
-                    pass
+            if _IS_LINUX:
+                desktop_dir = self.get_desktop_dir()
+                desktop_dir.mkdir(parents=True, exist_ok=True)
+
+        # The commands that start a gui
+        for cmd in self._launcher_cmds:
+            # Try running it with the --add_launcher argument (see p3lib launcher.py)
+            # This supports creation of a GUI launcher with an icon on
+            # Linux, Windows and macos platforms.
+            # On Windows and macos an icon is created on the desktop.
+            # On Linux platforms a gnome application launcher is created.
+            try:
+                full_cmd = bin_dir / cmd
+                if _IS_WIN and not full_cmd.name.endswith(".bat"):
+                    full_cmd = full_cmd.with_name(full_cmd.name + ".bat")
+                if full_cmd.exists():
+                    subprocess.check_call([full_cmd, "--add_launcher"])
+            except Exception:
+                # Fail silently as cmd may not support the create gui launcher functionality
+                pass
 
         # Create a file to track ownership of launchers
         meta = {
@@ -627,7 +1078,12 @@ exec "{entrypoint}" "$@"
             "commands": list(self.CMD_DICT.keys())
         }
         meta_file = base / version / "install.json"
-        meta_file.write_text(json.dumps(meta, indent=2))
+        # Write to a temporary file and rename it so that a partially written
+        # install.json is never left behind.
+        tmp = self.tmp_path(meta_file)
+        tmp.write_bytes(json.dumps(meta, separators=(",", ":")).encode())
+        os.replace(tmp, meta_file)
+        _load_meta.cache_clear()
 
     def current_link(self, base):
         return base / "current"
@@ -639,7 +1095,7 @@ exec "{entrypoint}" "$@"
 
         try:
             if p.is_symlink():
-                return p.resolve().name
+                return os.path.basename(os.path.normpath(os.readlink(p)))
             else:
                 v = p.read_text().strip()
                 return v if v else None
@@ -650,15 +1106,18 @@ exec "{entrypoint}" "$@"
         p = self.current_link(base)
         target = base / version
 
-        if platform.system() == "Windows":
+        if _IS_WIN:
             p.write_text(version)
         else:
-            if p.exists() or p.is_symlink():
-                p.unlink()
-            p.symlink_to(target)
+            # Create the new link under a temporary name and rename it over the
+            # old one so that the current link is replaced atomically.
+            tmp = self.tmp_path(p)
+            tmp.unlink(missing_ok=True)
+            tmp.symlink_to(target)
+            os.replace(tmp, p)
 
     def status(self):
-        base = Path(self.args.base).resolve()
+        base = self.get_base()
         versions = self.all_versions(base)
         current = self.get_current_version(base)
 
@@ -678,18 +1137,8 @@ exec "{entrypoint}" "$@"
             mark = "*" if v == current else " "
             self.info(f" {mark} {v}")
 
-    def ensure_pip(self, venv_path: Path):
-        python_exe = venv_path / ("Scripts/python.exe" if platform.system() == "Windows" else "bin/python")
-        try:
-            subprocess.check_call([str(python_exe), "-m", "pip", "--version"],
-                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except Exception:
-            self.info("Installing pip into virtualenv...")
-            subprocess.check_call([str(python_exe), "-m", "ensurepip", "--upgrade"])
-            subprocess.check_call([str(python_exe), "-m", "pip", "install", "--upgrade", "pip", "setuptools", "wheel"])
-
     def install(self):
-        base = Path(self.args.base).resolve()
+        base = self.get_base()
         wheel_path = Path(self.args.wheel)
         if not wheel_path.exists():
             self.die(f"Wheel file '{wheel_path}' does not exist")
@@ -700,8 +1149,7 @@ exec "{entrypoint}" "$@"
         venv_path = base / version / "venv"
 
         self.create_venv(venv_path)
-        self.ensure_pip(venv_path)
-        self.install_wheel(venv_path, wheel_path)
+        self.install_wheel(venv_path, wheel_path, self.args.verbose)
         self.create_launchers(base, version, venv_path)
         self.set_current_version(base, version)
         self.info(f"{self.APP_NAME} version {version} installed successfully")
@@ -1,6 +1,7 @@
 import asyncio
-import inspect
+import contextlib
 import json
+import threading
 from time import time
 from bleak import BleakClient, BleakScanner, BleakError
 from mpy_tool._lib.general import MCUBase
@@ -17,6 +18,35 @@ class BlueTooth(object):
     # device name instead.
     MACOS_ESP32_BT_DEV_NAME = "MPY ESP32"
 
+    # The time at which bluetooth was last found to be enabled and how long this
+    # result is used before IsBluetoothEnabled() checks again.
+    BLUETOOTH_ENABLED_TIME = None
+    BLUETOOTH_ENABLED_CACHE_SECONDS = 60
+
+    # The sync methods run their coroutines in a single event loop on a background thread.
+    _EVENT_LOOP = None
+    _EVENT_LOOP_LOCK = threading.Lock()
+
+    @staticmethod
+    def _GetEventLoop():
+        """@return The event loop used by the sync methods. The loop and the thread
+                   that runs it are started on first use and then run for the life of the process."""
+        with BlueTooth._EVENT_LOOP_LOCK:
+            if BlueTooth._EVENT_LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="BlueToothEventLoop", daemon=True).start()
+                BlueTooth._EVENT_LOOP = loop
+        return BlueTooth._EVENT_LOOP
+
+    @staticmethod
+    def _Run(coro):
+        """@brief Run a coroutine to completion in the shared event loop and wait for the result.
+                  This is called from any thread (E.G a GUI worker thread) and reuses the same
+                  loop rather than creating and closing a loop for every call as asyncio.run() does.
+           @param coro The coroutine to run.
+           @return The value returned by the coroutine."""
+        return asyncio.run_coroutine_threadsafe(coro, BlueTooth._GetEventLoop()).result()
+
     @staticmethod
     async def _IsBluetoothEnabled():
         """@brief Check if Bluetooth is available on the local machine.
@@ -38,8 +68,22 @@ class BlueTooth(object):
     @staticmethod
     def IsBluetoothEnabled():
         """@brief Check if Bluetooth is available on the local machine.
+                  Once bluetooth is found to be enabled the result is reused for
+                  BLUETOOTH_ENABLED_CACHE_SECONDS so that a scan is not needed on every call.
+                  A disabled result is not cached so that the user can enable bluetooth
+                  and try again.
            @return True is bluetooth is enabled/available."""
-        return asyncio.run(BlueTooth._IsBluetoothEnabled())
+        enabled_time = BlueTooth.BLUETOOTH_ENABLED_TIME
+        if enabled_time is not None and time() < enabled_time + BlueTooth.BLUETOOTH_ENABLED_CACHE_SECONDS:
+            return True
+        enabled = BlueTooth._Run(BlueTooth._IsBluetoothEnabled())
+        BlueTooth.BLUETOOTH_ENABLED_TIME = time() if enabled else None
+        return enabled
+
+    @staticmethod
+    def InvalidateBluetoothEnabled():
+        """@brief Force the next IsBluetoothEnabled() call to check bluetooth again."""
+        BlueTooth.BLUETOOTH_ENABLED_TIME = None
 
     @staticmethod
     async def _Scan(seconds):
@@ -49,35 +93,70 @@ class BlueTooth(object):
         return await BleakScanner.discover(timeout=seconds)
 
     @staticmethod
-    def Scan(seconds=5, dev_filter_string=None):
+    async def _ScanAdv(seconds):
+        """@brief Scan for bluetooth devices.
+           @param seconds The number of seconds to scan for.
+           @return A dict of (device, advertisement data) tuples keyed by device address."""
+        return await BleakScanner.discover(timeout=seconds, return_adv=True)
+
+    @staticmethod
+    async def _ScanUntil(predicate, seconds):
+        """@brief Scan for bluetooth devices until a device is found that predicate accepts.
+                  The scan stops as soon as the device is detected rather than after a fixed time.
+           @param predicate A function that is passed a bluetooth device and its advertisement
+                            data and returns True if it is the device required.
+           @param seconds The maximum number of seconds to scan for.
+           @return The bluetooth device found or None if not found."""
+        found = asyncio.get_running_loop().create_future()
+
+        def detection_callback(device, advertisement_data):
+            if not found.done() and predicate(device, advertisement_data):
+                found.set_result(device)
+
+        async with BleakScanner(detection_callback=detection_callback):
+            try:
+                return await asyncio.wait_for(found, timeout=seconds)
+            except asyncio.TimeoutError:
+                return None
+
+    @staticmethod
+    def _NameMatches(device, advertisement_data, dev_filter_string):
+        """@brief Check if a bluetooth device name matches a filter. The name in the
+                  advertisement data is the name set by the device. This is used in
+                  preference to the device name which the OS may have cached.
+           @param device The bluetooth device.
+           @param advertisement_data The advertisement data received from the device.
+           @param dev_filter_string The string the device name must start with.
+           @return True if the device matches."""
+        name = advertisement_data.local_name or device.name
+        if name and name.startswith(dev_filter_string):
+            return True
+        return MCUBase.IsMacOSPlatform() and device.name == BlueTooth.MACOS_ESP32_BT_DEV_NAME
+
+    @staticmethod
+    def Scan(seconds=5, dev_filter_string=None, first_only=False):
         """@brief Scan for bluetooth devices.
            @param dev_filter_string If True then only bluetooth devices that
                   start with this string are included in the bluetooth device list.
            @param seconds The number of seconds to scan for.
+           @param first_only If True and dev_filter_string is set the scan stops as soon as
+                             a matching device is found and only that device is returned.
            @return A list of bluetooth devices."""
-        device_list = []
-        dev_list = asyncio.run(BlueTooth._Scan(seconds))
-        if dev_filter_string:
-            for device in dev_list:
-                if device.name and device.name.startswith(dev_filter_string):
-                    device_list.append(device)
-                elif MCUBase.IsMacOSPlatform() and device.name == BlueTooth.MACOS_ESP32_BT_DEV_NAME:
-                    device_list.append(device)
-
-        else:
-            device_list = dev_list
-        return device_list
+        if dev_filter_string and first_only:
+            device = BlueTooth._Run(BlueTooth._ScanUntil(lambda dev, adv: BlueTooth._NameMatches(dev, adv, dev_filter_string), seconds))
+            return [device] if device else []
 
-    STORED_EXCEPTION = None
-    @staticmethod
-    def SetException(exception):
-        """@brief Set an error instance.
-           @param exception The error instance."""
-        BlueTooth.STORED_EXCEPTION = exception
+        if dev_filter_string:
+            dev_adv_dict = BlueTooth._Run(BlueTooth._ScanAdv(seconds))
+            return [device for device, adv in dev_adv_dict.values() if BlueTooth._NameMatches(device, adv, dev_filter_string)]
+        return BlueTooth._Run(BlueTooth._Scan(seconds))
 
     def __init__(self, uio=None, rx_timeout_seconds=10, rx_finished_timeout_seconds=0.2):
         self._uio = uio
-        self._rx_list = []
+        # Holds the data received over bluetooth. Each message from the device ends in a '\n' character.
+        self._rx_buf = bytearray()
+        # Set by _notification_handler() when data is received while waiting for a response.
+        self._rx_event = None
         # If we received no data over bluetooth we wait this long.
         self._rx_timeout_seconds = rx_timeout_seconds
         # Once we start receiving data over bluetooth this timeout must occur before we stop listening.
@@ -92,18 +171,16 @@ class BlueTooth(object):
             self._uio.debug(msg)
 
     async def _notification_handler(self, sender, data):
-        """@brief Called when data is received over a bluetooth connection in order to record it."""
-        self._rx_list.append(data.decode())
+        """@brief Called when data is received over a bluetooth connection in order to record it.
+                  The data is added to a single buffer that is split into lines when read."""
+        self._rx_buf.extend(data)
+        if self._rx_event:
+            self._rx_event.set()
 
     def _raise_exception_on_error(self):
         """@brief If an error/exception has occurred in the async env raise it in the sync env."""
-        if BlueTooth.STORED_EXCEPTION:
-            raise BlueTooth.STORED_EXCEPTION
-
-    def _set_exception(self, exception):
-        """@brief Set an error instance.
-           @param exception The error instance."""
-        BlueTooth.SetException(exception)
+        if self.exception:
+            raise self.exception
 
     def get_exception(self):
         """@return An exception instance if an error has occurred. If no error has occurred then None is returned."""
@@ -114,68 +191,72 @@ class BlueTooth(object):
         self.exception = None
 
     def _clear_rx_list(self):
-        """@brief Clear the list that holds messages received over the bluetooth interface."""
-        # Clear the RX data buffer
-        self._rx_list.clear()
+        """@brief Clear the buffer that holds the data received over the bluetooth interface."""
+        del self._rx_buf[:]
 
-    async def _waitfor_response(self, client, clear_rx_list= True):
+    def _get_rx_lines(self):
+        """@return A list of the lines received over the bluetooth interface.
+                   json.loads() parses these directly."""
+        return self._rx_buf.split(b'\n')
+
+    async def _waitfor_response(self, client, clear_rx_list= True, rx_timeout_seconds=None):
         """@brief Waitfor a response to a previously command previously sent over the bluetooth interface.
            @param client A connected BleakClient.
-           @param clear_rx_list If True the self._rx_list is cleared before we start listening for bluetooth data."""
+           @param clear_rx_list If True the self._rx_buf is cleared before we start listening for bluetooth data.
+           @param rx_timeout_seconds If set this overrides the rx_timeout_seconds passed to the constructor."""
+        if rx_timeout_seconds is None:
+            rx_timeout_seconds = self._rx_timeout_seconds
         if clear_rx_list:
             self._clear_rx_list()
 
+        # Created here so that it belongs to the running event loop.
+        self._rx_event = asyncio.Event()
+        if self._rx_buf:
+            self._rx_event.set()
+
         try:
-            self.debug(f"{inspect.currentframe().f_code.co_name}: Waiting for RX data.")
+            self.debug("_waitfor_response: Waiting for RX data.")
             start_time = time()
-            while True:
-                await asyncio.sleep(0.25)
-                # We have started receiving some data
-                if self._rx_list:
-                    self.debug(f"{inspect.currentframe().f_code.co_name}: Some data received.")
-                    break
-
-                if time() >= start_time + self._rx_timeout_seconds:
-                    raise Exception(f"No data received for {self._rx_timeout_seconds} seconds.")
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), timeout=rx_timeout_seconds)
+            except asyncio.TimeoutError:
+                raise Exception(f"No data received for {rx_timeout_seconds} seconds.")
+            # We have started receiving some data
+            self.debug("_waitfor_response: Some data received.")
 
-            self.debug(f"{inspect.currentframe().f_code.co_name}: Waiting for RX data.")
-            msg_count = len(self._rx_list)
-            last_msg_count = msg_count
-            last_rx_time = time()
+            self.debug("_waitfor_response: Waiting for RX data.")
             while True:
-                await asyncio.sleep(0.25)
-                # We have started receiving some data
-                if self._rx_list:
-                    self.debug(f"{inspect.currentframe().f_code.co_name}: Some data received.")
-                    break
-
-                msg_count = len(self._rx_list)
-                if msg_count > last_msg_count:
-                    last_msg_count = msg_count
-                    last_rx_time = time()
-
-                # We've stopped receiving bluetooth data so exit
-                elif time() > last_rx_time + self._rx_timeout_seconds:
+                self._rx_event.clear()
+                try:
+                    await asyncio.wait_for(self._rx_event.wait(), timeout=self._rx_finished_timeout_seconds)
+                except asyncio.TimeoutError:
+                    # We've stopped receiving bluetooth data so exit
                     break
 
-                if time() >= start_time + self._rx_timeout_seconds:
+                if time() >= start_time + rx_timeout_seconds:
                     raise Exception("Timeout waiting for bluetooth data reception to cease.")
 
         except Exception as ex:
-            self.debug(f"{inspect.currentframe().f_code.co_name}: Error: {str(ex)}")
+            self.debug(f"_waitfor_response: Error: {str(ex)}")
             self.exception = ex
 
         finally:
-            await client.stop_notify(YDevBlueTooth.NOTIFY_UUID)
+            self._rx_event = None
 
-        return self._rx_list
+        return self._get_rx_lines()
 
 class YDevBlueTooth(BlueTooth):
     """@brief Responsible for communication with a YDev device via bluetooth.
               Bluetooth has to be enabled on the local machine and YDev device
               for this to work. To enable Bluetooth on a YDev device hold the
               Wifi button down until the YDev unit reboots and the blue and
-              green led's flash."""
+              green led's flash.
+              The a_* methods are the awaitable forms of the public methods. These
+              allow several devices (one YDevBlueTooth instance per device) to be
+              set up in parallel. E.G
+              await asyncio.gather(*[YDevBlueTooth().a_provision(address, ssid, password) for address in addresses])
+              The number of simultaneous connections is limited by the bluetooth
+              adapter and OS (typically 5 - 7 on Linux)."""
 
     WRITE_CHAR_UUID = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"  # Replace with actual UUID
     NOTIFY_UUID = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"      # Notification UUID
@@ -186,45 +267,115 @@ class YDevBlueTooth(BlueTooth):
 
     SSID = 'SSID'
     PASSWORD = 'PASSWD'
-    SETUP_WIFI_CMD_DICT = {'CMD': 'BT_CMD_STA_CONNECT', f'{SSID}': '', f'{PASSWORD}': ''}
+    # Only the SSID and password change so these (JSON encoded) are inserted into
+    # a fixed command rather than encoding a dict for every command.
+    SETUP_WIFI_CMD_TEMPLATE = b'{"CMD": "BT_CMD_STA_CONNECT", "SSID": %s, "PASSWD": %s}'
 
     IP_ADDRESS = "IP_ADDRESS"
+    # The minimum time between GET_IP_CMD commands.
+    GET_IP_RETRY_SECONDS = 2
 
     YDEV = "YDEV"
 
     @staticmethod
-    def ScanYDev(seconds=5):
-        """@brief Scan for bluetooth devices.
-           @param dev_filter_string If True then only bluetooth devices that
-                  start with this string are included in the bluetooth device list.
+    def ScanYDev(seconds=5, first_only=False):
+        """@brief Scan for YDev bluetooth devices.
            @param seconds The number of seconds to scan for.
+           @param first_only If True the scan stops as soon as a YDev device is found.
            @return A list of bluetooth devices."""
-        return YDevBlueTooth.Scan(seconds=seconds, dev_filter_string=YDevBlueTooth.YDEV)
+        return YDevBlueTooth.Scan(seconds=seconds, dev_filter_string=YDevBlueTooth.YDEV, first_only=first_only)
 
     def __init__(self, uio=None):
         super().__init__(uio=uio)
+        # The connection opened by connect() and its cached write characteristic.
+        self._client = None
+        self._write_char = None
+
+    async def connect(self, address):
+        """@brief Connect to a YDev device and keep the connection open. Until disconnect()
+                  is called the async methods reuse this connection rather than connecting
+                  (and discovering the GATT services) for every command.
+           @param address The bluetooth address of the device."""
+        await self.disconnect()
+        client = BleakClient(address)
+        await client.connect()
+        self._client = client
+        self._write_char = client.services.get_characteristic(YDevBlueTooth.WRITE_CHAR_UUID)
+        self.debug(f"connect: Connected to {address}")
+        # The notifier is left running until disconnect() so that each command does
+        # not pay for a descriptor write to start it.
+        await client.start_notify(YDevBlueTooth.NOTIFY_UUID, self._notification_handler)
+        self.debug("connect: started RX data notifier.")
+
+    async def disconnect(self):
+        """@brief Close the connection opened by connect() if open."""
+        client = self._client
+        self._client = None
+        self._write_char = None
+        if client:
+            await client.disconnect()
+
+    @contextlib.asynccontextmanager
+    async def _connection(self, address):
+        """@brief Get a connected BleakClient. The connection opened by connect() is used if it is
+                  to the same device. Otherwise a connection is opened for the duration of the
+                  with block.
+           @param address The bluetooth address of the device."""
+        if self._client and self._client.is_connected and self._client.address == address:
+            yield self._client
+        else:
+            async with BleakClient(address) as client:
+                yield client
+
+    async def _start_notify(self, client):
+        """@brief Start receiving data from the YDev device. The notifier of the connection
+                  opened by connect() is already running. Other connections stop their
+                  notifier when they disconnect.
+           @param client A connected BleakClient."""
+        if client is not self._client:
+            await client.start_notify(YDevBlueTooth.NOTIFY_UUID, self._notification_handler)
+            self.debug("_start_notify: started RX data notifier.")
+
+    async def _write(self, client, data, ack_required=True):
+        """@brief Write a command to the YDev device.
+           @param client A connected BleakClient.
+           @param data The bytes to write.
+           @param ack_required If False and the device supports it the data is written
+                               without waiting for the device to acknowledge the write.
+                               This saves a round trip when the reply to the command
+                               confirms that it was received."""
+        # Passing the characteristic rather than its UUID saves bleak looking it up.
+        if client is self._client and self._write_char:
+            char = self._write_char
+        else:
+            char = client.services.get_characteristic(YDevBlueTooth.WRITE_CHAR_UUID)
+        if char is None:
+            await client.write_gatt_char(YDevBlueTooth.WRITE_CHAR_UUID, data, response=True)
+        else:
+            response = ack_required or "write-without-response" not in char.properties
+            await client.write_gatt_char(char, data, response=response)
 
     async def _wifi_scan(self, address):
         """@brief Send a cmd to the YDev unit to get it to scan for WiFi networks that it can see.
            @param address The bluetooth address of the device.
            @return A list of strings detailing the network parameters."""
+        self.exception = None
         try:
-            async with BleakClient(address) as client:
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Connected to {address}")
+            async with self._connection(address) as client:
+                self.debug(f"_wifi_scan: Connected to {address}")
 
-                await client.start_notify(YDevBlueTooth.NOTIFY_UUID, self._notification_handler)
-                self.debug(f"{inspect.currentframe().f_code.co_name}: started RX data notifier.")
+                await self._start_notify(client)
 
                 data = YDevBlueTooth.WIFI_SCAN_CMD
-                await client.write_gatt_char(YDevBlueTooth.WRITE_CHAR_UUID, data, response=True)
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Data written: {data}")
+                await self._write(client, data, ack_required=False)
+                self.debug(f"_wifi_scan: Data written: {data}")
 
                 await self._waitfor_response(client)
 
         except Exception as e:
-            self._set_exception(e)
+            self.exception = e
 
-        return self._rx_list
+        return self._get_rx_lines()
 
     def wifi_scan(self, address):
         """@brief Send a cmd to the YDev unit to get it to scan for WiFi networks that
@@ -238,16 +389,26 @@ class YDevBlueTooth(BlueTooth):
                   BSSID
                   SECURITY
         """
-        line_list = asyncio.run(self._wifi_scan(address))
+        return BlueTooth._Run(self.a_wifi_scan(address))
+
+    async def a_wifi_scan(self, address):
+        """@brief The awaitable form of wifi_scan().
+           @param address The bluetooth address of the device.
+           @return See wifi_scan()."""
+        line_list = await self._wifi_scan(address)
         # This sometimes generates an error even though the scan worked.
         # Therefore we ignore the error, rather than calling self._raise_exception_on_error().
-        self._set_exception(None)
+        self.exception = None
         dict_list = []
         for line in line_list:
-            try:
-                dict_list.append(json.loads(line))
-            except json.decoder.JSONDecodeError:
-                pass
+            line = line.strip()
+            # Only lines that hold a JSON object are parsed rather than raising
+            # and catching an exception for every other line received.
+            if line.startswith(b'{') and line.endswith(b'}'):
+                try:
+                    dict_list.append(json.loads(line))
+                except ValueError:
+                    pass
         return dict_list
 
     async def _setup_wifi(self, address, ssid, password):
@@ -255,52 +416,51 @@ class YDevBlueTooth(BlueTooth):
            @param address The bluetooth address of the device.
            @param ssid The WiFi SSID.
            @param password The WiFi password."""
+        self.exception = None
         try:
-            async with BleakClient(address) as client:
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Connected to {address}")
+            async with self._connection(address) as client:
+                self.debug(f"_setup_wifi: Connected to {address}")
 
-                YDevBlueTooth.SETUP_WIFI_CMD_DICT[YDevBlueTooth.SSID] = ssid
-                YDevBlueTooth.SETUP_WIFI_CMD_DICT[YDevBlueTooth.PASSWORD] = password
-                cmd_str = json.dumps(YDevBlueTooth.SETUP_WIFI_CMD_DICT)
-
-                data = cmd_str.encode()
-                await client.write_gatt_char(YDevBlueTooth.WRITE_CHAR_UUID, data, response=True)
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Data written: {data}")
+                data = YDevBlueTooth.SETUP_WIFI_CMD_TEMPLATE % (json.dumps(ssid).encode(), json.dumps(password).encode())
+                await self._write(client, data)
+                self.debug(f"_setup_wifi: Data written: {data}")
 
         except Exception as e:
-            self._set_exception(e)
+            self.exception = e
 
-        return self._rx_list
+        return self._get_rx_lines()
 
     def setup_wifi(self, address, ssid, password):
         """@brief Set the WiFi SSID and password for the YDev device.
            @param address The bluetooth address of the device.
            @param ssid The WiFi SSID.
            @param password The WiFi password."""
-        response = asyncio.run(self._setup_wifi(address, ssid, password))
+        return BlueTooth._Run(self.a_setup_wifi(address, ssid, password))
+
+    async def a_setup_wifi(self, address, ssid, password):
+        """@brief The awaitable form of setup_wifi().
+           @param address The bluetooth address of the device.
+           @param ssid The WiFi SSID.
+           @param password The WiFi password."""
+        response = await self._setup_wifi(address, ssid, password)
         self._raise_exception_on_error()
         return response
 
-    def waitfor_device(self, address, timeout=30):
+    async def a_waitfor_device(self, address, timeout=30):
         """@brief Waitfor a YDev device to appear.
+           @param address The bluetooth address of the device.
            @param timeout The number of seconds before we give up looking.
            @return The Bluetooth device found or None if not found."""
-        dev_found = None
-        start_time = time()
-        waiting = True
-        while waiting:
-            dev_list = YDevBlueTooth.Scan(seconds=3)
-            for dev in dev_list:
-                if dev.address == address:
-                    dev_found = dev
-                    waiting = False
-                    break
+        # A single scan is left running so that the first advertisement from
+        # the device is seen as soon as it restarts.
+        return await BlueTooth._ScanUntil(lambda dev, adv: dev.address == address, timeout)
 
-            # Quit on timeout
-            if time() >= start_time + timeout:
-                break
-
-        return dev_found
+    def waitfor_device(self, address, timeout=30):
+        """@brief Waitfor a YDev device to appear.
+           @param address The bluetooth address of the device.
+           @param timeout The number of seconds before we give up looking.
+           @return The Bluetooth device found or None if not found."""
+        return BlueTooth._Run(self.a_waitfor_device(address, timeout=timeout))
 
     async def _get_ip(self, address, timeout=60):
         """@brief Get the IP address of the YDev device. This is only useful after setup_wifi() has been called.
@@ -308,46 +468,65 @@ class YDevBlueTooth(BlueTooth):
            @param timeout The number of seconds to wait for the IP address to be received.
            @return The IP address of the device."""
         ip_address = None
+        self.exception = None
         try:
-            async with BleakClient(address) as client:
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Connected to {address}")
+            async with self._connection(address) as client:
+                self.debug(f"_get_ip: Connected to {address}")
 
-                await client.start_notify(YDevBlueTooth.NOTIFY_UUID, self._notification_handler)
-                self.debug(f"{inspect.currentframe().f_code.co_name}: started RX data notifier.")
+                await self._start_notify(client)
 
                 # Wait for an IP address of the device over a bluetooth connection.
-                timeout = time() + timeout
+                # The command is only sent again if the device responds without an IP
+                # address (E.G it has not yet connected to the WiFi network).
+                deadline = time() + timeout
                 while True:
-                    try:
-                        data = YDevBlueTooth.GET_IP_CMD
-                        await client.write_gatt_char(YDevBlueTooth.WRITE_CHAR_UUID, data, response=True)
-                        self.debug(f"{inspect.currentframe().f_code.co_name}: Data written: {data}")
+                    data = YDevBlueTooth.GET_IP_CMD
+                    write_time = time()
+                    await self._write(client, data, ack_required=False)
+                    self.debug(f"_get_ip: Data written: {data}")
 
-                        await self._waitfor_response(client)
+                    await self._waitfor_response(client, rx_timeout_seconds=max(deadline - time(), 0))
 
-                        if self._rx_list:
-                            line = self._rx_list[0].rstrip('\r\n')
-                            rx_dict = json.loads(line)
-                            if YDevBlueTooth.IP_ADDRESS in rx_dict:
-                                ip_address = rx_dict[YDevBlueTooth.IP_ADDRESS]
-                                break
+                    ip_address = self._get_ip_address(self._get_rx_lines())
+                    if ip_address:
+                        # Any error waiting for an earlier response no longer matters.
+                        self.exception = None
+                        break
 
-                        if time() >= timeout:
-                            raise Exception("Failed to get IP address over bluetooth.")
+                    if time() >= deadline:
+                        raise Exception("Failed to get IP address over bluetooth.")
 
-                    except Exception as ex:
-                        print(str(ex))
+                    await asyncio.sleep(max(write_time + YDevBlueTooth.GET_IP_RETRY_SECONDS - time(), 0))
 
         except Exception as e:
-            self._set_exception(e)
+            self.exception = e
 
         return ip_address
 
+    def _get_ip_address(self, line_list):
+        """@brief Get the IP address from the lines received in response to the GET_IP_CMD.
+           @param line_list The lines received.
+           @return The IP address or None if not found."""
+        for line in line_list:
+            try:
+                rx_dict = json.loads(line.rstrip(b'\r\n'))
+            except ValueError:
+                continue
+            if isinstance(rx_dict, dict) and YDevBlueTooth.IP_ADDRESS in rx_dict:
+                return rx_dict[YDevBlueTooth.IP_ADDRESS]
+        return None
+
     def get_ip(self, address):
         """@brief Get the IP address of the YDev device. This is only useful after setup_wifi() has been called.
            @param address The bluetooth address of the device.
            @return The IP address of the device."""
-        response = asyncio.run(self._get_ip(address))
+        return BlueTooth._Run(self.a_get_ip(address))
+
+    async def a_get_ip(self, address):
+        """@brief The awaitable form of get_ip().
+           @param address The bluetooth address of the device.
+           @return The IP address of the device."""
+        response = await self._get_ip(address)
         self._raise_exception_on_error()
         return response
 
@@ -355,30 +534,78 @@ class YDevBlueTooth(BlueTooth):
         """@brief Disable the bluetooth interface on the YDev device.
                   To enable bluetooth on the YDev device the WiFi switch
                   must be held down until the device restarts."""
+        self.exception = None
         try:
-            async with BleakClient(address) as client:
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Connected to {address}")
+            async with self._connection(address) as client:
+                self.debug(f"_disable_bluetooth: Connected to {address}")
 
                 data = YDevBlueTooth.DISABLE_BLUETOOTH
-                await client.write_gatt_char(YDevBlueTooth.WRITE_CHAR_UUID, data, response=True)
-                self.debug(f"{inspect.currentframe().f_code.co_name}: Data written: {data}")
+                await self._write(client, data, ack_required=False)
+                self.debug(f"_disable_bluetooth: Data written: {data}")
 
         except Exception as e:
             e_str = str(e)
             # Ignore this error as it appears the command completes successfully when it occurs
             if e_str.find("Unlikely Error") == -1:
                 # Raise all other errors
-                self._set_exception(e)
+                self.exception = e
 
-        return self._rx_list
+        return self._get_rx_lines()
 
     def disable_bluetooth(self, address):
         """@brief Disable the bluetooth interface on the YDev device.
                   To enable bluetooth on the YDev device the WiFi switch
                   must be held down until the device restarts."""
-        asyncio.run(self._disable_bluetooth(address))
+        BlueTooth._Run(self.a_disable_bluetooth(address))
+
+    async def a_disable_bluetooth(self, address):
+        """@brief The awaitable form of disable_bluetooth().
+           @param address The bluetooth address of the device."""
+        await self._disable_bluetooth(address)
         self._raise_exception_on_error()
 
+    async def a_provision(self, address, ssid, password, disable_bluetooth=True):
+        """@brief Set up the WiFi on a YDev device and get its IP address. All the steps
+                  are run in one event loop and each connection to the device is reused
+                  for all the commands sent over it.
+           @param address The bluetooth address of the device.
+           @param ssid The WiFi SSID.
+           @param password The WiFi password.
+           @param disable_bluetooth If True the bluetooth interface on the YDev device is
+                                    disabled once the IP address has been read.
+           @return The IP address of the device."""
+        try:
+            await self.connect(address)
+            await self._setup_wifi(address, ssid, password)
+            self._raise_exception_on_error()
+            # The device restarts to connect to the WiFi network.
+            await self.disconnect()
+
+            if await self.a_waitfor_device(address) is None:
+                raise Exception(f"YDev device ({address}) not found after restart.")
+
+            await self.connect(address)
+            ip_address = await self._get_ip(address)
+            self._raise_exception_on_error()
+            if disable_bluetooth:
+                await self._disable_bluetooth(address)
+                self._raise_exception_on_error()
+
+        finally:
+            await self.disconnect()
+
+        return ip_address
+
+    def provision(self, address, ssid, password, disable_bluetooth=True):
+        """@brief Set up the WiFi on a YDev device and get its IP address.
+           @param address The bluetooth address of the device.
+           @param ssid The WiFi SSID.
+           @param password The WiFi password.
+           @param disable_bluetooth If True the bluetooth interface on the YDev device is
+                                    disabled once the IP address has been read.
+           @return The IP address of the device."""
+        return BlueTooth._Run(self.a_provision(address, ssid, password, disable_bluetooth=disable_bluetooth))
+
 
 """
 
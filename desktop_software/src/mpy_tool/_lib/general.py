@@ -13,6 +13,11 @@ class MCUBase(object):
     """@brief A base class that holds generally used methods.
               In part it implements methods used to display user."""
 
+    # On Linux the FTDI USB serial driver holds received data for latency_timer ms (16 by default)
+    # before passing it on. Write access to this file for non root users requires a udev rule E.G
+    # ACTION=="add", SUBSYSTEM=="usb-serial", DRIVER=="ftdi_sio", ATTR{latency_timer}="1"
+    USB_SERIAL_LATENCY_TIMER_FILE = "/sys/bus/usb-serial/devices/{}/latency_timer"
+
     @staticmethod
     def IsWindowsPlatform():
         """@return True if running on a Windows machine."""
@@ -173,6 +178,50 @@ class MCUBase(object):
 
         return portInfoList[0].device
 
+    def _serialPortPresent(self):
+        """@return True if the serial port last opened is present on this machine."""
+        return any(portInfo.device == self._serialPort for portInfo in MCUBase.GetSerialPortList())
+
+    def waitForSerialPortRestart(self, vanishTimeoutSeconds=2, reappearTimeoutSeconds=3, settleSeconds=0.5):
+        """@brief Wait for the serial port last opened to be available after the MCU has been reset.
+                  On some platforms the serial port disappears and then reappears when the MCU restarts.
+                  If the serial port disappears we wait for it to reappear, otherwise we wait until
+                  vanishTimeoutSeconds has elapsed.
+           @param vanishTimeoutSeconds The number of seconds to wait for the serial port to disappear.
+           @param reappearTimeoutSeconds The number of seconds to wait for the serial port to reappear.
+           @param settleSeconds The number of seconds to wait after the serial port reappears. The serial
+                                port may be listed before the USB serial device can be opened."""
+        if getattr(self, "_serialPort", None) is None:
+            return
+
+        timeoutS = time()+vanishTimeoutSeconds
+        while self._serialPortPresent():
+            if time() >= timeoutS:
+                return
+            sleep(0.05)
+
+        self.debug(f"{self._serialPort}: Removed.")
+        timeoutS = time()+reappearTimeoutSeconds
+        while not self._serialPortPresent():
+            if time() >= timeoutS:
+                self.debug(f"{reappearTimeoutSeconds} second timeout waiting for {self._serialPort} to reappear.")
+                return
+            sleep(0.05)
+        self.debug(f"{self._serialPort}: Present.")
+        sleep(settleSeconds)
+
+    def _setSerialPortLowLatency(self):
+        """@brief Attempt to set the USB serial latency timer of the serial port last opened to 1 ms.
+                  This is only supported by some USB serial adapters on Linux platforms. Any failure is ignored."""
+        latencyTimerFile = MCUBase.USB_SERIAL_LATENCY_TIMER_FILE.format(os.path.basename(os.path.realpath(self._serialPort)))
+        if os.path.isfile(latencyTimerFile):
+            try:
+                with open(latencyTimerFile, 'w') as fd:
+                    fd.write('1')
+                self.debug(f"{self._serialPort}: Set latency timer to 1 ms.")
+            except OSError:
+                pass
+
     # We retry this method as it has been found that this sometimes fails if a RPi Pico has just started.
     # When it fails a permission error is generated which is not the case on the next attempt.
     @retry(Exception, tries=3, delay=0.5)
@@ -192,6 +241,7 @@ class MCUBase(object):
         self._ser.rtscts = False
         self._ser.xonxoff = False
         self._ser.open()
+        self._setSerialPortLowLatency()
         self._ser.dtr=dtr
         self._ser.rts=rts
         self.debug(f"Opened serial port {self._serialPort}, DTR={dtr}, RTS={rts}")
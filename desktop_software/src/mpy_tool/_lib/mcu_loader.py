@@ -1,4 +1,5 @@
 import os
+import re
 import shutil
 import string
 import serial
@@ -14,6 +15,7 @@ import ping3
 import esptool
 import io
 import sys
+import importlib.metadata
 
 from   p3lib.helper import get_assets_dir
 
@@ -23,8 +25,10 @@ from mpy_tool._lib.general import MCUBase
 from time import sleep, time
 from retry import retry
 from copy import copy
+from functools import lru_cache
 from subprocess import check_call, PIPE, check_output
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 from random import random
 
 class LoaderBase(MCUBase):
@@ -40,6 +44,8 @@ class LoaderBase(MCUBase):
     WIFI_CONFIGURED_KEY         = "WIFI_CONFIGURED"
     SSID_KEY                    = "SSID"
 
+    MPY_CACHE_FOLDER            = "mpy_cache"
+
     MAIN_PY_FILE                = "main.py"
     MAIN_MPY_FILE               = "main.mpy"
 
@@ -61,6 +67,32 @@ class LoaderBase(MCUBase):
     PICOW_BRD_ID                = 'RPI-RP2'
     PICO2W_BRD_ID               = 'RP2350'
 
+    # For each MCU type a tuple containing
+    # 0 = The text that identifies the MCU in the response to CTRL B at the REPL prompt.
+    # 1 = Additional text that identifies the MCU in the response to an esptool check_id command.
+    MCU_ID_TEXT                 = {ESP32_MCU_TYPE:      (("ESP32 ",), ("ESP32",)), # Space required to ensure it's not a later esp32 variant.
+                                   ESP32C3_MCU_TYPE:    (("ESP32C3",), ("ESP32-C3",)),
+                                   # At the current time esp32c6 MicroPython support is in progress.
+                                   # The current version of MicroPython reports ESP32 rather than ESP32C6.
+                                   ESP32C6_MCU_TYPE:    (("ESP32", "ESP32C6"), ("ESP32-C6",)),
+                                   RPI_PICOW_MCU_TYPE:  (("RP2040",), ()),
+                                   RPI_PICO2W_MCU_TYPE: (("RP2350",), ())}
+
+    REPL_PROMPT                 = b">>> "
+    # Matches the line holding the uos.statvfs() tuple. The groups are f_bsize, f_blocks and f_bfree.
+    STATVFS_REGEX               = re.compile(r"^\((\d+), \d+, (\d+), (\d+), \d+", re.MULTILINE)
+
+    # The results of GetFiles() keyed by search path. Each value is a tuple containing a dict
+    # of the modification times of the folders searched and the list of files found.
+    _GET_FILES_CACHE            = {}
+    # The results of CheckPythonCode() keyed by root path. Each value is a tuple containing
+    # the signature of the files checked and the messages generated.
+    _CHECK_PYTHON_CODE_CACHE    = {}
+    # Set to True or False the first time doPing() determines if this process can create an ICMP socket.
+    _ICMP_SOCKET_ALLOWED        = None
+    # The maximum number of pings that doPingMany() sends at the same time.
+    MAX_PING_WORKERS            = 64
+
     @staticmethod
     def IsPicoW(mcuType):
         return mcuType in LoaderBase.VALID_PICOW_TYPES
@@ -72,16 +104,52 @@ class LoaderBase(MCUBase):
     @staticmethod
     def GetFiles(fileList, searchPath):
         """@brief Recursively search for files in a folder.
+                  The files found are cached and reused while no folder in the search path has been modified.
            @param fileList The list of files to add to.
            @param searchPath The path to search for files."""
-        entries = os.listdir(searchPath)
-        for entry in entries:
-            fullPath = os.path.join(searchPath, entry)
-            if os.path.isfile(fullPath) and fullPath not in fileList:
-                fileList.append(fullPath)
+        cached = LoaderBase._GET_FILES_CACHE.get(searchPath)
+        if cached is None or not LoaderBase._FoldersUnchanged(cached[0]):
+            folderMTimes = {}
+            foundFileList = []
+            LoaderBase._FindFiles(foundFileList, folderMTimes, searchPath)
+            cached = (folderMTimes, foundFileList)
+            LoaderBase._GET_FILES_CACHE[searchPath] = cached
 
-            elif os.path.isdir(fullPath):
-                LoaderBase.GetFiles(fileList, fullPath)
+        presentFiles = set(fileList)
+        fileList.extend(f for f in cached[1] if f not in presentFiles)
+
+    @staticmethod
+    def _FindFiles(fileList, folderMTimes, searchPath):
+        """@brief Recursively search for files in a folder.
+           @param fileList The list of files to add to.
+           @param folderMTimes A dict to add the modification time of each folder searched to.
+           @param searchPath The path to search for files."""
+        folderMTimes[searchPath] = os.stat(searchPath).st_mtime_ns
+        # scandir() returns the entry type with each entry so no stat() call is needed per file.
+        with os.scandir(searchPath) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    fileList.append(entry.path)
+
+                elif entry.is_dir():
+                    LoaderBase._FindFiles(fileList, folderMTimes, entry.path)
+
+    @staticmethod
+    def _FoldersUnchanged(folderMTimes):
+        """@param folderMTimes A dict of folder modification times as created by _FindFiles().
+           @return True if none of the folders have been modified."""
+        try:
+            for folder, mTime in folderMTimes.items():
+                if os.stat(folder).st_mtime_ns != mTime:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def ClearGetFilesCache():
+        """@brief Clear the cached GetFiles() results. Called when files are created or deleted."""
+        LoaderBase._GET_FILES_CACHE.clear()
 
     @staticmethod
     def GetSubFileList(inputFileList, extension, include=True):
@@ -93,18 +161,29 @@ class LoaderBase(MCUBase):
                           files with the given extension from the returned file list.
            @return A list containing a subset or identical list of fileList
                    containing only files with the given extension."""
+        matchingFileList, otherFileList = LoaderBase.PartitionByExtension(inputFileList, extension)
+        if include:
+            return matchingFileList
+        return otherFileList
+
+    @staticmethod
+    def PartitionByExtension(inputFileList, extension):
+        """@brief Split a list of files into those with and those without the given extension.
+           @param inputFileList The input file list to split.
+           @param extension The file extension to search for.
+           @return A tuple containing
+                   0 = A list of the files with the given extension.
+                   1 = A list of the files without the given extension."""
         if not extension.startswith("."):
             extension = "."+extension
-        outputFileList = []
+        matchingFileList = []
+        otherFileList = []
         for f in inputFileList:
             if f.endswith(extension):
-                if include:
-                    outputFileList.append(f)
+                matchingFileList.append(f)
             else:
-                if not include:
-                    outputFileList.append(f)
-
-        return outputFileList
+                otherFileList.append(f)
+        return matchingFileList, otherFileList
 
     @staticmethod
     def ResetESP32(uio, ser):
@@ -123,6 +202,26 @@ class LoaderBase(MCUBase):
         uio.info("Released esp32 hardware reset.")
         sleep(0.25)
 
+    @staticmethod
+    def REPLCommand(ser, cmdLine, timeout):
+        """@brief Send a command to an MCU running MicroPython presenting the interactive python REPL prompt
+                  and read the response. The response is returned as soon as the next REPL prompt is received
+                  rather than after a fixed delay.
+           @param ser The open serial port connected to the MCU.
+           @param cmdLine The command line to send.
+           @param timeout The maximum number of seconds to wait for the REPL prompt.
+           @return The response text."""
+        # Discard any data (E.G a previous REPL prompt) received before the command is sent.
+        ser.reset_input_buffer()
+        ser.write(cmdLine.encode())
+        orgTimeout = ser.timeout
+        ser.timeout = timeout
+        try:
+            data = ser.read_until(LoaderBase.REPL_PROMPT)
+        finally:
+            ser.timeout = orgTimeout
+        return data.decode("utf-8", errors="ignore")
+
     @staticmethod
     def REPLGetFileContents(ser, filename):
         """@brief Get the contents of a text file when the serial port is connected to an MCU running MicroPython
@@ -133,20 +232,18 @@ class LoaderBase(MCUBase):
         line = None
         fileContents = None
         startTime = time()
-        while fileContents is None and time() < startTime+2:
+        while fileContents is None:
+            remaining = max(0.0, startTime+2-time())
+            if remaining == 0:
+                break
             cmdLine = f'fd = open("{filename}") ; lines = fd.readlines() ; fd.close() ; print(lines[0])\r'
-            ser.write(cmdLine.encode())
-            sleep(0.25) # Give the MCU time to respond
-            bytesAvailable = ser.in_waiting
-            if bytesAvailable > 0:
-                data = ser.read(bytesAvailable)
-                if len(data) > 0:
-                    data=data.decode("utf-8", errors="ignore")
-                    lines = data.split("\n")
-                    for line in lines:
-                        if line.startswith('{"'):
-                            fileContents = line
-                            break
+            data = LoaderBase.REPLCommand(ser, cmdLine, remaining)
+            if len(data) > 0:
+                lines = data.split("\n")
+                for line in lines:
+                    if line.startswith('{"'):
+                        fileContents = line
+                        break
         return line
 
     @staticmethod
@@ -159,31 +256,22 @@ class LoaderBase(MCUBase):
                    1 = Free space in bytes."""
         totalBytes = -1
         freeBytes  = -1
-        fileContents = None
         startTime = time()
-        while fileContents is None and time() < startTime+2:
+        while totalBytes < 0:
+            remaining = max(0.0, startTime+2-time())
+            if remaining == 0:
+                break
             cmdLine = "import uos ; uos.statvfs('/')\r"
-            ser.write(cmdLine.encode())
-            sleep(0.25) # Give the MCU time to respond
-            bytesAvailable = ser.in_waiting
-            if bytesAvailable > 0:
-                data = ser.read(bytesAvailable)
-                if len(data) > 0:
-                    data=data.decode("utf-8", errors="ignore")
-                    lines = data.split("\n")
-                    for line in lines:
-                        line=line.rstrip("\n\r")
-                        if line.startswith('(') and line.endswith(')'):
-                            line = line[1:-1]
-                            elems = line.split(", ")
-                            values = list(map(int, elems))
-                            if len(values) > 4:
-                                totalBytes = values[0] * values[2]
-                                freeBytes = values[0] * values[3]
-                            break
+            data = LoaderBase.REPLCommand(ser, cmdLine, remaining)
+            match = LoaderBase.STATVFS_REGEX.search(data)
+            if match:
+                blockSize = int(match.group(1))
+                totalBytes = blockSize * int(match.group(2))
+                freeBytes = blockSize * int(match.group(3))
         return [totalBytes, freeBytes]
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def GetTempFolder():
         """@return The temp storage folder."""
         tempFolder = tempfile.gettempdir()
@@ -200,13 +288,23 @@ class LoaderBase(MCUBase):
            @param uio An optional UIO instance to add debug message."""
         if uio:
             uio.debug(f"Saving to {filename}")
-        with open(filename, 'w') as fd:
-            json.dump(theDict, fd, ensure_ascii=False)
+        # Encode in one call rather than json.dump() writing each part of the JSON text separately.
+        jsonBytes = json.dumps(theDict, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+        with open(filename, 'wb') as fd:
+            fd.write(jsonBytes)
 
     @staticmethod
     def CheckPythonCode(rootPath):
         """@brief Check the python code using pyflakes
-           @param rootPAth The root path of the python code to check."""
+           @param rootPAth The root path of the python code to check.
+           @return The messages generated. The previous messages are returned if no file has changed."""
+        signature = None
+        if os.path.isdir(rootPath):
+            signature = LoaderBase._GetFolderSignature(rootPath)
+            cached = LoaderBase._CHECK_PYTHON_CODE_CACHE.get(rootPath)
+            if cached and cached[0] == signature:
+                return cached[1]
+
         # Custom reporter to capture messages
         class CaptureReporter(Reporter):
             def __init__(self):
@@ -217,7 +315,23 @@ class LoaderBase(MCUBase):
                 return self.output.getvalue()
         reporter = CaptureReporter()
         checkRecursive((rootPath,), reporter)
-        return reporter.get_messages()
+        messages = reporter.get_messages()
+        if signature:
+            LoaderBase._CHECK_PYTHON_CODE_CACHE[rootPath] = (signature, messages)
+        return messages
+
+    @staticmethod
+    def _GetFolderSignature(rootPath):
+        """@brief Get a signature that changes if any file in or below a folder is added, removed or modified.
+           @param rootPath The folder.
+           @return The signature string."""
+        fileList = []
+        LoaderBase.GetFiles(fileList, rootPath)
+        sha256 = hashlib.sha256()
+        for aFile in sorted(fileList):
+            fileStat = os.stat(aFile)
+            sha256.update(f"{aFile}\0{fileStat.st_mtime_ns}\0{fileStat.st_size}\n".encode())
+        return sha256.hexdigest()
 
     @staticmethod
     def GenByteCode(pythonFile):
@@ -225,6 +339,18 @@ class LoaderBase(MCUBase):
            @param pythonFile The python file to be converted.
            @return The python bytecode file after conversion."""
         outputFile = pythonFile.replace(".py",".mpy")
+        # The local *.mpy files are deleted after each load so a copy of each one is kept in
+        # a cache and reused while the python file is unchanged.
+        cachedFile, keyFile, key = LoaderBase._GetCachedByteCodeFile(pythonFile)
+        try:
+            with open(keyFile) as fd:
+                cacheValid = fd.read() == key
+        except OSError:
+            cacheValid = False
+        if cacheValid and os.path.isfile(cachedFile):
+            shutil.copyfile(cachedFile, outputFile)
+            return outputFile
+
         process = mpy_cross.run(f"{pythonFile}", stdout=PIPE)
         # Wait for conversion to complete
         process.wait()
@@ -232,8 +358,47 @@ class LoaderBase(MCUBase):
             raise Exception(f"Process to convert {pythonFile} to bytecode failed (return code = {process.returncode}).")
         if not os.path.isfile(outputFile):
             raise Exception("Failed to create {} python bytecode file.".format(outputFile))
+
+        # Overwrite the cache entry for this python file. The key file is removed first so that
+        # the entry is never valid while the bytecode file is being replaced.
+        os.makedirs(os.path.dirname(cachedFile), exist_ok=True)
+        if os.path.isfile(keyFile):
+            os.remove(keyFile)
+        tmpFile = f"{cachedFile}.{os.getpid()}.tmp"
+        shutil.copyfile(outputFile, tmpFile)
+        os.replace(tmpFile, cachedFile)
+        with open(tmpFile, 'w') as fd:
+            fd.write(key)
+        os.replace(tmpFile, keyFile)
         return outputFile
 
+    @staticmethod
+    def _GetCachedByteCodeFile(pythonFile):
+        """@brief Get the cache entry for a python file. There is one entry for each python file
+                  path which is overwritten when the python file or mpy_cross version changes.
+           @param pythonFile The python file.
+           @return A tuple containing
+                   0 = The absolute path of the cached bytecode file.
+                   1 = The absolute path of the file holding the key of the cached bytecode file.
+                   2 = The key that the cached bytecode file must have to be used. This is derived
+                       from the mpy_cross version and the contents of the python file."""
+        pathHash = hashlib.sha256(os.path.abspath(pythonFile).encode()).hexdigest()
+        cacheBase = os.path.join(LoaderBase.GetTempFolder(), LoaderBase.MPY_CACHE_FOLDER, pathHash)
+        sha256 = hashlib.sha256()
+        sha256.update(LoaderBase._GetMpyCrossVersion().encode())
+        with open(pythonFile, 'rb') as fd:
+            sha256.update(fd.read())
+        return (cacheBase + LoaderBase.MICROPYTHON_FILE_EXTENSION, cacheBase + ".key", sha256.hexdigest())
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _GetMpyCrossVersion():
+        """@return The version of the installed mpy_cross package or an empty string if unknown."""
+        try:
+            return importlib.metadata.version("mpy-cross")
+        except importlib.metadata.PackageNotFoundError:
+            return getattr(mpy_cross, "__version__", "")
+
     @staticmethod
     def GetRShellPath(aPath):
         """@brief Convert a path to a path that can be used by rshell.
@@ -326,16 +491,18 @@ class LoaderBase(MCUBase):
         for aFile in fileList:
             if os.path.isfile(aFile):
                 os.remove(aFile)
+                LoaderBase.ClearGetFilesCache()
                 if showMsg:
                     self.debug("Deleted local {}".format(aFile))
 
     def _getRShellCmd(self, port, cmdFile):
         """@brief Get the RSHell command line.
            @param port The serial port to use.
-           @param cmdFile The rshell command to execute."""
+           @param cmdFile The rshell command to execute.
+           @return The command line as an argument list so that it can be run without a shell."""
         dtr=1
         rts=1
-        cmd = f'mpy_tool_rshell --rts {rts} --dtr {dtr} --timing -p {port} --buffer-size 128 -f "{cmdFile}"'
+        cmd = ["mpy_tool_rshell", "--rts", str(rts), "--dtr", str(dtr), "--timing", "-p", port, "--buffer-size", "128", "-f", cmdFile]
         return cmd
 
     def _runRshellCmdFile(self, port, cmdFile, allowFailure=False):
@@ -345,14 +512,14 @@ class LoaderBase(MCUBase):
            @param allowFailure If True then allow the command to fail. If False then an exception is thrown if the command fails.
            @return the output from the command executed as a string."""
         rshellCmd = self._getRShellCmd(port, cmdFile)
-        self.debug(f"EXECUTING: {rshellCmd}")
+        self.debug(f"EXECUTING: {" ".join(rshellCmd)}")
         if allowFailure:
             try:
-                return check_output(rshellCmd, shell=True).decode("utf-8", errors="ignore")
+                return check_output(rshellCmd).decode("utf-8", errors="ignore")
             except Exception as ex:
                 self.error( str(ex) )
         else:
-            return check_output(rshellCmd, shell=True).decode("utf-8", errors="ignore")
+            return check_output(rshellCmd).decode("utf-8", errors="ignore")
 
     def _runRShell(self, cmdList):
         """@brief Run an rshell command file.
@@ -360,10 +527,8 @@ class LoaderBase(MCUBase):
         cmdFile = MCULoader.RSHELL_CMD_LIST_FILE
         self.debug(f"Creating {cmdFile}")
         # Create the rshell cmd file.
-        fd = open(cmdFile, 'w')
-        for line in cmdList:
-            fd.write(f"{line}\n")
-        fd.close()
+        with open(cmdFile, 'w') as fd:
+            fd.write("".join(f"{line}\n" for line in cmdList))
         self._runRshellCmdFile(self._serialPort, MCULoader.RSHELL_CMD_LIST_FILE)
 
     def _checkMCUCorrect(self, line, checkIDLine=False):
@@ -372,38 +537,9 @@ class LoaderBase(MCUBase):
            @param line The line of text received in response to CTRL B on the serial port.
            @param If True the line is an esptool check_id command response. The esptool check_id command
                   returns different text to identify the device."""
-        correct = False
-        mcu = self._mcu
-        if mcu == LoaderBase.ESP32_MCU_TYPE:
-            if checkIDLine and "ESP32" in line:
-                    correct = True
-
-            elif "ESP32 " in line: # Space required to ensure it's not a later esp32 variant.
-                correct = True
-
-        elif mcu == LoaderBase.ESP32C3_MCU_TYPE:
-            if checkIDLine and "ESP32-C3" in line:
-                    correct = True
-
-            elif "ESP32C3" in line:
-                correct = True
-
-        elif mcu == LoaderBase.ESP32C6_MCU_TYPE:
-            if checkIDLine and "ESP32-C6" in line:
-                    correct = True
-            # At the current time esp32c6 MicroPython support is in progress.
-            # The current version of MicroPython reports ESP32 rather than ESP32C6.
-            elif "ESP32" in line or "ESP32C6" in line:
-                    correct = True
-
-        elif mcu == LoaderBase.RPI_PICOW_MCU_TYPE:
-            if "RP2040" in line:
-                correct = True
-
-        elif mcu == LoaderBase.RPI_PICO2W_MCU_TYPE:
-            if "RP2350" in line:
-                correct = True
-
+        replIDText, checkIDText = LoaderBase.MCU_ID_TEXT.get(self._mcu, ((), ()))
+        idText = replIDText + checkIDText if checkIDLine else replIDText
+        correct = any(text in line for text in idText)
         if not correct:
             raise Exception(f"Incorrect MCU type. A {self._mcu} MCU is not connected via a USB cable.")
 
@@ -538,12 +674,15 @@ class LoaderBase(MCUBase):
            @param esp32HWReboot If True and the HW is a type of esp32 MCU then the HW reset pin is used to reset it."""
         self.info(f"Rebooting the MCU ({self._mcu})")
 
-        self._closeSerialPort()
-
         if esp32HWReboot and self._mcu in USBLoader.VALID_ESP32_TYPES:
-            self.esp32HWReset()
+            try:
+                # Reuse the serial port if it is already open.
+                self.esp32HWReset(ser=self._ser, closeSer=False)
+            finally:
+                self._closeSerialPort()
 
         else:
+            self._closeSerialPort()
             try:
                 # Attempt to connect to the board under test python prompt
                 self._checkMicroPython(closeSerialPort=False)
@@ -560,10 +699,9 @@ class LoaderBase(MCUBase):
             finally:
                 self._closeSerialPort()
 
-        # We need a short delay or subsequent serial port use throws errors
-        # possibly because the serial port disappears and then reappears as observed on Linux.
-        # 1 second fails sometimes, 1.5 seconds seems ok but this may be machine dependant !!!
-        sleep(2)
+        # Subsequent serial port use throws errors if the serial port disappears and then
+        # reappears (as observed on Linux) so wait for this rather than a fixed delay.
+        self.waitForSerialPortRestart()
 
     def _getWiFiDict(self, ssid, password):
         """@brief Get a dict containing the Wifi configuration.
@@ -578,11 +716,12 @@ class LoaderBase(MCUBase):
 
     def _convertToMPY(self, pyFileList):
         """@brief Generate *.mpy files for all files in app1 and app1/lib
-           @param pyFileList Python file list."""
-        mpyFileList = []
-        for pyFile in pyFileList:
-            mpyFile = LoaderBase.GenByteCode(pyFile)
-            mpyFileList.append(mpyFile)
+           @param pyFileList Python file list.
+           @return A list of the *.mpy files in the same order as pyFileList."""
+        # Each file is converted by a separate mpy_cross process so run several at once.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            mpyFileList = list(executor.map(LoaderBase.GenByteCode, pyFileList))
+        LoaderBase.ClearGetFilesCache()
 
         return mpyFileList
 
@@ -597,9 +736,8 @@ class LoaderBase(MCUBase):
         if loadMPYFiles:
             fileList = []
             LoaderBase.GetFiles(fileList, self._appRootFolder)
-            pyFileList = LoaderBase.GetSubFileList(fileList, LoaderBase.PYTHON_FILE_EXTENSION)
+            pyFileList, nonPyFileList = LoaderBase.PartitionByExtension(fileList, LoaderBase.PYTHON_FILE_EXTENSION)
             # Build a list of files that are not *.py or *.mpy files.
-            nonPyFileList = LoaderBase.GetSubFileList(fileList, LoaderBase.PYTHON_FILE_EXTENSION, include=False)
             nonPyFileList = LoaderBase.GetSubFileList(nonPyFileList, LoaderBase.MICROPYTHON_FILE_EXTENSION, include=False)
 
             mainPy = os.path.join(self._appRootFolder, LoaderBase.MAIN_PY_FILE)
@@ -633,17 +771,17 @@ class LoaderBase(MCUBase):
         """@brief Remove one or more files from a list of files.
            @param delFileList The list of files to be removed from the mainFileList.
            @param mainFileList The list of files from which the above file/s are to be removed."""
-        for delFile in delFileList:
-            self._removeFileFromList(delFile, mainFileList)
+        delFiles = set(delFileList)
+        mainFileList[:] = [f for f in mainFileList if f not in delFiles]
 
     def _removeFileFromList(self, theFile, theList):
         """@brief Remove a file from a list of files.
            @param theFile The file to be removed from the list of files.
            @param theList The list of files from which the above file is to be removed."""
-        if theFile in theList:
-            index = theList.index(theFile)
-            if index >= 0:
-                del theList[index]
+        try:
+            theList.remove(theFile)
+        except ValueError:
+            pass
 
     def deleteLocalMPYFiles(self, showMsg=True):
         """@brief Delete existing *.mpy files,
@@ -662,9 +800,14 @@ class LoaderBase(MCUBase):
         if self._windowsPlatform:
             # On windows we can use the python ping3 module
             pingSec = ping3.ping(address)
+        elif LoaderBase.ICMPSocketAllowed():
+            # This avoids starting a ping process for every ping.
+            pingSec = ping3.ping(address, timeout=1)
+            if pingSec is False:
+                pingSec = None
         else:
             # On Linux the ping3 module gives 'Permission denied' errors for non root users
-            # so we use the command line ping instead.
+            # unless they are allowed to create ICMP sockets so we use the command line ping instead.
             try:
                 startT = time()
                 cmd = f"ping -W 1 -c 1 {address} 2>&1 > /dev/null"
@@ -674,6 +817,37 @@ class LoaderBase(MCUBase):
                 pass
         return pingSec
 
+    def doPingMany(self, addresses, maxWorkers=32):
+        """@brief Attempt to ping several addresses at the same time.
+           @param addresses The addresses to ping.
+           @param maxWorkers The maximum number of pings in progress at any time (limited to MAX_PING_WORKERS).
+           @return A dict keyed by address. Each value is as returned by doPing() for the address."""
+        addresses = list(addresses)
+        if not addresses:
+            return {}
+        maxWorkers = max(1, min(maxWorkers, LoaderBase.MAX_PING_WORKERS, len(addresses)))
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            pingSecList = list(executor.map(self.doPing, addresses))
+        return dict(zip(addresses, pingSecList))
+
+    @staticmethod
+    def ICMPSocketAllowed():
+        """@brief Determine if this process can create an ICMP socket as used by the ping3 module.
+                  The ping3 module uses a raw ICMP socket if possible and falls back to an ICMP datagram
+                  socket. On Linux non root users can only create the latter if their group is in the
+                  net.ipv4.ping_group_range sysctl setting. The result is cached.
+           @return True if an ICMP socket can be created."""
+        if LoaderBase._ICMP_SOCKET_ALLOWED is None:
+            LoaderBase._ICMP_SOCKET_ALLOWED = False
+            for sockType in (socket.SOCK_RAW, socket.SOCK_DGRAM):
+                try:
+                    socket.socket(socket.AF_INET, sockType, socket.IPPROTO_ICMP).close()
+                    LoaderBase._ICMP_SOCKET_ALLOWED = True
+                    break
+                except OSError:
+                    pass
+        return LoaderBase._ICMP_SOCKET_ALLOWED
+
     def _waitForPingSuccess(self, address, restartTimeout=60, pingHoldSecs = 3):
         """@brief Wait for a reconnect to the WiFi network.
            @param address The address of the MCU on the wiFi network.
@@ -741,8 +915,9 @@ class USBLoader(LoaderBase):
     ESP32_PRODUCT_ID                = 60000
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def GetPicoImagesFolder():
-        """@return The Pico image file folder."""
+        """@return The Pico image file folder. This is cached after the first successful call."""
         imageFolder = os.path.join(get_assets_dir('mpy_tool'), USBLoader.PICO_IMAGE_FOLDER_NAME)
         if not os.path.isdir(imageFolder):
             raise Exception(f"{imageFolder} path not found.")
@@ -765,8 +940,9 @@ class USBLoader(LoaderBase):
         return microPythonFile
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def GetPico2WImagesFolder():
-        """@return The Pico 2 W image file folder."""
+        """@return The Pico 2 W image file folder. This is cached after the first successful call."""
         imageFolder = os.path.join(get_assets_dir('mpy_tool'), USBLoader.PICO2W_IMAGE_FOLDER_NAME)
         if not os.path.isdir(imageFolder):
             raise Exception(f"{imageFolder} path not found.")
@@ -789,8 +965,9 @@ class USBLoader(LoaderBase):
         return microPythonFile
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def GetESP32ImagesFolder():
-        """@return The esp32 image file folder."""
+        """@return The esp32 image file folder. This is cached after the first successful call."""
         imageFolder = os.path.join(get_assets_dir('mpy_tool'), USBLoader.ESP32_IMAGE_FOLDER_NAME)
         if not os.path.isdir(imageFolder):
             raise Exception(f"{imageFolder} path not found.")
@@ -0,0 +1,101 @@
+import errno
+import os
+
+import pytest
+
+import copy_examples
+
+FILES = {"a.py": b"print('a')\n",
+         os.path.join("lib", "b.py"): b"b = 1\n",
+         os.path.join("lib", "data", "c.bin"): b"\x00\x01\x02" * 100}
+
+
+@pytest.fixture
+def copied(monkeypatch):
+    """@return A list that records the destination of every file linked or copied."""
+    copied = []
+    link_or_copy = copy_examples.link_or_copy
+
+    def record(src, dst):
+        copied.append(dst)
+        link_or_copy(src, dst)
+
+    monkeypatch.setattr(copy_examples, "link_or_copy", record)
+    return copied
+
+
+@pytest.fixture
+def no_hard_links(monkeypatch):
+    """@brief Make os.link() fail as it does when the source and destination are on different filesystems."""
+    def link(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", link)
+
+
+def make_trees(tmp_path):
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    for name, data in FILES.items():
+        (src / name).parent.mkdir(parents=True, exist_ok=True)
+        (src / name).write_bytes(data)
+    (src / ".ropeproject").mkdir()
+    (src / ".ropeproject" / "config.py").write_bytes(b"")
+    dst.mkdir()
+    return src, dst
+
+
+def check_trees(src, dst):
+    for name in FILES:
+        assert (dst / name).read_bytes() == (src / name).read_bytes()
+        assert (dst / name).stat().st_mtime_ns == (src / name).stat().st_mtime_ns
+    assert not (dst / ".ropeproject").exists()
+
+
+def test_first_sync_copies_everything(tmp_path, copied):
+    src, dst = make_trees(tmp_path)
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    assert sorted(copied) == sorted(str(dst / name) for name in FILES)
+    check_trees(src, dst)
+
+
+def test_unchanged_resync_copies_nothing(tmp_path, copied):
+    src, dst = make_trees(tmp_path)
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    copied.clear()
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    assert copied == []
+    check_trees(src, dst)
+
+
+def test_touched_or_resized_file_is_recopied(tmp_path, copied, no_hard_links):
+    # Without hard links the destination files are separate copies of the source files.
+    src, dst = make_trees(tmp_path)
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    copied.clear()
+
+    touched = src / "a.py"
+    st = touched.stat()
+    os.utime(touched, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    resized = src / "lib" / "b.py"
+    mtime_ns = resized.stat().st_mtime_ns
+    resized.write_bytes(b"b = 12\n")
+    # Keep the modification time so that only the size differs.
+    os.utime(resized, ns=(mtime_ns, mtime_ns))
+
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    assert sorted(copied) == sorted([str(dst / "a.py"), str(dst / "lib" / "b.py")])
+    check_trees(src, dst)
+
+
+def test_sync_without_hard_links(tmp_path, copied, no_hard_links):
+    src, dst = make_trees(tmp_path)
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    assert sorted(copied) == sorted(str(dst / name) for name in FILES)
+    check_trees(src, dst)
+    for name in FILES:
+        assert not os.path.samefile(src / name, dst / name)
+
+    copied.clear()
+    copy_examples.synctree_multithreaded(str(src), str(dst))
+    assert copied == []
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import venv
+
+import pytest
+
+from install import MpyToolInstaller
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Venvs are not cloned on Windows.")
+def test_clone_venv(tmp_path):
+    src_venv = tmp_path / "base" / "1.0" / "venv"
+    dst_venv = tmp_path / "base" / "1.1" / "venv"
+    venv.EnvBuilder(with_pip=False, symlinks=True).create(str(src_venv))
+    src_bin = src_venv / "bin"
+
+    # A console script as created by pip and binary files with and without the venv path.
+    script = src_bin / "mpy_tool"
+    script.write_text(f"#!{src_bin / 'python'}\nimport sys\nprint(sys.prefix)\n")
+    script.chmod(0o755)
+    binary_with_path = b"\x00\xff\xfe" + str(src_venv).encode() + b"\x80"
+    (src_bin / "with_path.bin").write_bytes(binary_with_path)
+    binary_without_path = b"\x00\xff\xfe\x80" * 16
+    (src_bin / "without_path.bin").write_bytes(binary_without_path)
+
+    installer = MpyToolInstaller(handle_cmd_line=False, color=False)
+    installer.clone_venv(src_venv, dst_venv)
+    dst_bin = dst_venv / "bin"
+
+    cfg = (dst_venv / "pyvenv.cfg").read_text()
+    assert str(src_venv) not in cfg
+    assert (src_venv / "pyvenv.cfg").read_text() == cfg.replace(str(dst_venv), str(src_venv))
+    assert (dst_bin / "mpy_tool").read_text().splitlines()[0] == f"#!{dst_bin / 'python'}"
+    assert os.access(dst_bin / "mpy_tool", os.X_OK)
+    assert str(dst_venv) in (dst_bin / "activate").read_text()
+    assert (dst_bin / "with_path.bin").read_bytes() == binary_with_path
+    assert (dst_bin / "without_path.bin").read_bytes() == binary_without_path
+
+    # The source venv is not changed through the hard links.
+    assert script.read_text().splitlines()[0] == f"#!{src_bin / 'python'}"
+    assert str(src_venv) in (src_bin / "activate").read_text()
+
+    prefix = subprocess.check_output([str(dst_bin / "python"), "-c", "import sys; print(sys.prefix)"], text=True).strip()
+    assert os.path.realpath(prefix) == os.path.realpath(dst_venv)
+    prefix = subprocess.check_output([str(dst_bin / "mpy_tool")], text=True).strip()
+    assert os.path.realpath(prefix) == os.path.realpath(dst_venv)